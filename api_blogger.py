@@ -1,16 +1,22 @@
 import os
 import json
 import time
+from datetime import datetime, timedelta, timezone
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 class BloggerPublisher:
-    def __init__(self):
-        self.blog_id = os.getenv('BLOG_ID')
+    def __init__(self, blog_id=None, service=None):
+        # 다중 프로필 실행에서는 인증된 service를 공유하고 blog_id만 프로필별로 지정합니다.
+        self.blog_id = blog_id or os.getenv('BLOG_ID')
         if not self.blog_id:
             print("[경고] .env 파일에 BLOG_ID가 설정되지 않았습니다.")
+
+        if service is not None:
+            self.service = service
+            return
         
         creds = None
         SCOPES = ['https://www.googleapis.com/auth/blogger']
@@ -55,61 +61,191 @@ class BloggerPublisher:
                 else:
                     raise e
     
-    def publish_video_post(self, analysis):
+    def _is_retryable(self, error):
+        # 서버가 오류 응답을 돌려준 경우에만 포스트가 만들어지지 않았다고 판단할 수 있습니다.
+        # 네트워크 오류/응답 누락은 이미 생성되었을 수 있으므로 여기서 재시도하지 않습니다.
+        return isinstance(error, HttpError) and error.resp.status in [403, 429, 500, 503]
+
+    def _find_published_titles(self, titles, since):
+        """since(RFC3339) 이후 발행된 포스트 중 titles에 해당하는 제목 집합을 반환합니다. 조회 실패 시 None."""
+        found = set()
+        page_token = None
         try:
-            # 메모리에서 온 List인지, DB에서 온 String인지 판별하여 유연하게 처리합니다.
-            def parse_json_field(field):
-                if isinstance(field, (list, dict)):
-                    return field
-                if isinstance(field, str):
-                    try:
-                        return json.loads(field)
-                    except (json.JSONDecodeError, TypeError):
-                        return [field] if field else []
-                return []
-
-            core_facts = parse_json_field(analysis.get('core_fact', []))
-            insights = parse_json_field(analysis.get('actionable_insight', []))
-            
-            info_val = analysis.get('information_value')
-            if info_val is None:
-                grade = analysis.get("grade", "N/A")
-                score = analysis.get("score", 0)
-                signal_ratio = analysis.get("signal_ratio", "N/A")
-                reasoning = analysis.get("reasoning", "")
-            else:
-                grade = info_val.get("grade", "N/A")
-                score = info_val.get("score", 0)
-                signal_ratio = info_val.get("signal_ratio", "N/A")
-                reasoning = info_val.get("reasoning", "")
-            
-            html_content = (
-                f'<div style="text-align:center;margin-bottom:20px;">'
-                f'<img src="{analysis.get("thumbnailUrl", analysis.get("thumbnail_url", ""))}" alt="thumbnail" style="max-width:100%;border-radius:8px;"/></div>'
-                f'<h3>핵심 사실 (Core Facts)</h3><ul>'
-                + ''.join([f'<li>{f}</li>' for f in core_facts]) +
-                f'</ul><h3>시사점 (Actionable Insights)</h3><ul>'
-                + ''.join([f'<li>{i}</li>' for i in insights]) +
-                f'</ul><h3>정보 가치 평가 (Evaluation)</h3>'
-                f'<p>{grade} ({score}/100) | 신호 비율: {signal_ratio}</p>'
-                f'<p>{reasoning}</p>'
-                f'<p><a href="{analysis.get("video_url", f"https://youtube.com/watch?v={analysis.get("videoId", "")}")}">원본 영상 보기</a></p>'
-            )
+            while True:
+                request = self.service.posts().list(
+                    blogId=self.blog_id, startDate=since, fetchBodies=False, maxResults=50,
+                    pageToken=page_token, fields='items(title),nextPageToken'
+                )
+                response = self._fetch_with_backoff(request)
+                found.update(item.get('title') for item in response.get('items', []) if item.get('title') in titles)
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    return found
+        except Exception as e:
+            print(f"  [발행 확인 실패] 최근 포스트 조회 중 오류: {str(e)}")
+            return None
 
-            body = {
-                'kind': 'blogger#post',
-                'blog': {'id': self.blog_id},
-                'title': analysis.get('title', '제목 없음'),
-                'content': html_content,
-                'labels': [analysis.get('category', '미분류')]
-            }
+    def _build_video_post_body(self, analysis):
+        # 메모리에서 온 List인지, DB에서 온 String인지 판별하여 유연하게 처리합니다.
+        def parse_json_field(field):
+            if isinstance(field, (list, dict)):
+                return field
+            if isinstance(field, str):
+                try:
+                    return json.loads(field)
+                except (json.JSONDecodeError, TypeError):
+                    return [field] if field else []
+            return []
 
+        core_facts = parse_json_field(analysis.get('core_fact', []))
+        insights = parse_json_field(analysis.get('actionable_insight', []))
+        
+        info_val = analysis.get('information_value')
+        if info_val is None:
+            grade = analysis.get("grade", "N/A")
+            score = analysis.get("score", 0)
+            signal_ratio = analysis.get("signal_ratio", "N/A")
+            reasoning = analysis.get("reasoning", "")
+        else:
+            grade = info_val.get("grade", "N/A")
+            score = info_val.get("score", 0)
+            signal_ratio = info_val.get("signal_ratio", "N/A")
+            reasoning = info_val.get("reasoning", "")
+        
+        html_content = (
+            f'<div style="text-align:center;margin-bottom:20px;">'
+            f'<img src="{analysis.get("thumbnailUrl", analysis.get("thumbnail_url", ""))}" alt="thumbnail" style="max-width:100%;border-radius:8px;"/></div>'
+            f'<h3>핵심 사실 (Core Facts)</h3><ul>'
+            + ''.join([f'<li>{f}</li>' for f in core_facts]) +
+            f'</ul><h3>시사점 (Actionable Insights)</h3><ul>'
+            + ''.join([f'<li>{i}</li>' for i in insights]) +
+            f'</ul><h3>정보 가치 평가 (Evaluation)</h3>'
+            f'<p>{grade} ({score}/100) | 신호 비율: {signal_ratio}</p>'
+            f'<p>{reasoning}</p>'
+            f'<p><a href="{analysis.get("video_url", f"https://youtube.com/watch?v={analysis.get("videoId", "")}")}">원본 영상 보기</a></p>'
+        )
+
+        return {
+            'kind': 'blogger#post',
+            'blog': {'id': self.blog_id},
+            'title': analysis.get('title', '제목 없음'),
+            'content': html_content,
+            'labels': [analysis.get('category', '미분류')]
+        }
+
+    def publish_video_post(self, analysis):
+        try:
+            body = self._build_video_post_body(analysis)
             request = self.service.posts().insert(blogId=self.blog_id, body=body, isDraft=False)
             self._fetch_with_backoff(request)
             print(f"  [발행 완료] {analysis.get('title')}")
         except Exception as e:
             print(f"  [발행 실패] {analysis.get('title')}: {str(e)}")
 
+    def publish_video_posts(self, analyses, remaining_posts=None, posts_per_minute=None, chunk_size=None, max_retries=3):
+        """
+        여러 영상 포스트를 BatchHttpRequest로 묶어 chunk_size개씩 한 번의 HTTP 요청으로 발행합니다.
+        chunk_size를 생략하면 남은 일간 발행 수(remaining_posts)와 분당 포스트 생성 한도
+        (posts_per_minute, BLOGGER_POSTS_PER_MINUTE 환경 변수, 기본 6) 중 작은 값으로 정해,
+        한도 안의 포스트는 한 번의 요청으로 보냅니다. 다음 청크는 앞선 청크가 분당 한도에서 차지한
+        시간(청크 포스트 수 x 60/posts_per_minute초)이 지난 뒤에 보냅니다. remaining_posts를 넘는 포스트는 발행하지 않습니다.
+
+        항목별 콜백으로 성공/실패를 기록하고, 서버가 재시도 가능한 오류(403/429/5xx)를 돌려준 항목만
+        지수 백오프 후 다시 보냅니다. posts.insert는 멱등하지 않으므로 네트워크 오류나 응답 누락으로
+        결과를 알 수 없는 항목은 최근 포스트를 제목으로 조회해 이미 생성되었는지 확인한 뒤에만 재시도하고,
+        조회도 실패하면 중복 발행을 피하기 위해 '결과 불명'으로 보고합니다.
+        발행에 성공한 분석 결과 목록을 반환합니다.
+        """
+        if posts_per_minute is None:
+            posts_per_minute = int(os.getenv('BLOGGER_POSTS_PER_MINUTE') or 6)
+        posts_per_minute = max(1, posts_per_minute)
+        if remaining_posts is not None:
+            analyses = analyses[:max(0, remaining_posts)]
+        if chunk_size is None:
+            chunk_size = min(posts_per_minute, len(analyses))
+        chunk_size = max(1, chunk_size)
+        seconds_per_post = 60 / posts_per_minute
+        # 결과 확인 조회는 이번 발행 시작 이후의 포스트만 대상으로 합니다.
+        since = (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat(timespec='seconds')
+
+        pending = {}
+        for i, analysis in enumerate(analyses):
+            try:
+                pending[str(i)] = (analysis, self._build_video_post_body(analysis))
+            except Exception as e:
+                print(f"  [발행 실패] {analysis.get('title')}: {str(e)}")
+
+        published = []
+        delay = 5
+        next_send_at = 0.0
+        for attempt in range(max_retries + 1):
+            failed = {}
+            request_ids = list(pending)
+
+            for start in range(0, len(request_ids), chunk_size):
+                chunk_ids = request_ids[start:start + chunk_size]
+                outcomes = {}
+
+                # 재시도 청크를 포함해 분당 생성 한도를 넘지 않도록 앞선 청크의 몫만큼 기다립니다.
+                wait = next_send_at - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                next_send_at = time.monotonic() + seconds_per_post * len(chunk_ids)
+
+                def callback(request_id, response, exception):
+                    outcomes[request_id] = exception
+
+                batch = self.service.new_batch_http_request(callback=callback)
+                for request_id in chunk_ids:
+                    body = pending[request_id][1]
+                    batch.add(self.service.posts().insert(blogId=self.blog_id, body=body, isDraft=False), request_id=request_id)
+
+                try:
+                    batch.execute()
+                except Exception as e:
+                    for request_id in chunk_ids:
+                        outcomes.setdefault(request_id, e)
+
+                unknown = {}
+                for request_id in chunk_ids:
+                    analysis = pending[request_id][0]
+                    error = outcomes.get(request_id, RuntimeError("배치 응답 누락"))
+                    if error is None:
+                        published.append(analysis)
+                        print(f"  [발행 완료] {analysis.get('title')}")
+                    elif self._is_retryable(error) and attempt < max_retries:
+                        failed[request_id] = pending[request_id]
+                    elif isinstance(error, HttpError):
+                        print(f"  [발행 실패] {analysis.get('title')}: {str(error)}")
+                    else:
+                        unknown[request_id] = error
+
+                if unknown:
+                    titles = {pending[request_id][1]['title'] for request_id in unknown}
+                    found = self._find_published_titles(titles, since)
+                    for request_id, error in unknown.items():
+                        analysis, body = pending[request_id]
+                        if found is None:
+                            print(f"  [발행 결과 불명] {analysis.get('title')}: {str(error)} "
+                                  "(중복 발행을 피하기 위해 재시도하지 않습니다. Blogger에서 확인하세요)")
+                        elif body['title'] in found:
+                            published.append(analysis)
+                            print(f"  [발행 확인] {analysis.get('title')}")
+                        elif attempt < max_retries:
+                            failed[request_id] = pending[request_id]
+                        else:
+                            print(f"  [발행 실패] {analysis.get('title')}: {str(error)}")
+
+            if not failed:
+                break
+
+            print(f"[지연] {len(failed)}개 포스트 발행 실패. {delay}초 후 실패 항목만 재시도합니다.")
+            time.sleep(delay)
+            delay *= 2
+            pending = failed
+
+        return published
+
     def publish_briefing_post(self, briefing, analyses, categories):
         try:
             today = briefing.get('date', '')
@@ -137,5 +273,7 @@ class BloggerPublisher:
             request = self.service.posts().insert(blogId=self.blog_id, body=body, isDraft=False)
             self._fetch_with_backoff(request)
             print("[통합 브리핑 발행 완료]")
+            return True
         except Exception as e:
-            print(f"[통합 브리핑 발행 실패] {str(e)}")
\ No newline at end of file
+            print(f"[통합 브리핑 발행 실패] {str(e)}")
+            return False
\ No newline at end of file
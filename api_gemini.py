@@ -1,14 +1,157 @@
 import os
+import copy
 import json
+import time
 from google import genai
 from google.genai import types
 
+# 분석 프롬프트에 포함하는 자막 최대 길이
+MAX_TRANSCRIPT_CHARS = 30000
+# 한국어 자막 기준 대략적인 문자/토큰 비율 (사전 예산 추정용, 보수적으로 설정)
+CHARS_PER_TOKEN = 1.5
+# 응답 스키마와 JSON 출력에 추가로 소모되는 토큰 추정치
+RESPONSE_TOKEN_OVERHEAD = 1500
+# 통합 브리핑 프롬프트에서 제외하는 필드 (자막 원문 등 브리핑에 필요 없는 대용량 필드)
+BRIEFING_EXCLUDED_FIELDS = (
+    'transcript', 'description', 'thumbnailUrl', 'thumbnail_url', 'video_url', 'publishedAt', 'cluster_members',
+    'change_seq'
+)
+# 명시적 컨텍스트 캐시를 만들 수 있는 모델별 최소 입력 토큰 수 (모델명 접두어 기준, 목록에 없으면 가장 큰 값)
+MIN_CACHE_TOKENS = {
+    'gemini-2.5-flash': 1024,
+    'gemini-2.5-pro': 4096,
+}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+def min_cache_tokens(model_name):
+    for prefix, minimum in MIN_CACHE_TOKENS.items():
+        if model_name.startswith(prefix):
+            return minimum
+    return DEFAULT_MIN_CACHE_TOKENS
+
+class GeminiContextCache:
+    def __init__(self, client, ttl_seconds=3600, refresh_margin_seconds=300, retry_after_seconds=3600, clock=time.time):
+        """
+        카테고리별 시스템 지시문을 Gemini 명시적 캐시(cached content)로 한 번만 올려 두고,
+        같은 날의 분석 호출에서는 캐시 이름만 전달하여 입력 토큰 비용과 첫 토큰 지연을 줄입니다.
+        응답 스키마(response_schema)는 생성 설정이라 캐시에 담을 수 없으므로 호출마다 따로 전달합니다.
+
+        - 처음 사용할 때 지시문 토큰 수를 세어 모델의 최소 캐시 크기(MIN_CACHE_TOKENS)에 못 미치면
+          한 번만 알리고 이 인스턴스가 살아 있는 동안 해당 (카테고리, 모델)은 캐시 없이 호출합니다.
+        - 만료 refresh_margin_seconds 전에 TTL을 연장하고, 이미 만료되었으면 새로 만듭니다.
+        - 그 밖의 이유로 캐시 생성이 실패하면(미지원 모델, 일시 오류 등) retry_after_seconds 동안
+          해당 (카테고리, 모델)은 캐시 없이 호출하도록 None을 반환합니다.
+        - client와 clock을 주입받으므로 로컬 가짜 클라이언트로 테스트할 수 있습니다.
+        """
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.clock = clock
+        # (category, model) -> {'name': 캐시 이름, 'expires_at': 만료 시각}
+        self._entries = {}
+        # (category, model) -> 캐시 생성을 다시 시도할 시각
+        self._disabled_until = {}
+        # (category, model) -> 최소 캐시 크기를 넘는지 여부 (지시문은 바뀌지 않으므로 한 번만 셉니다)
+        self._large_enough = {}
+
+    def _count_tokens(self, model_name, system_instruction):
+        # Gemini Developer API의 count_tokens는 system_instruction 설정을 받지 않으므로 본문으로 셉니다.
+        try:
+            return self.client.models.count_tokens(model=model_name, contents=system_instruction).total_tokens
+        except Exception as e:
+            print(f"  [토큰 계산 실패, 문자 수로 추정] {model_name}: {str(e)}")
+            return int(len(system_instruction) / CHARS_PER_TOKEN)
+
+    def _is_large_enough(self, key, model_name, system_instruction):
+        if key not in self._large_enough:
+            tokens = self._count_tokens(model_name, system_instruction)
+            minimum = min_cache_tokens(model_name)
+            self._large_enough[key] = tokens >= minimum
+            if tokens < minimum:
+                print(f"  [컨텍스트 캐시 생략] {key[0]} / {model_name}: 지시문 {tokens} 토큰이 "
+                      f"최소 캐시 크기 {minimum} 토큰보다 작아 캐시 없이 호출합니다.")
+        return self._large_enough[key]
+
+    def _create(self, key, model_name, system_instruction):
+        category = key[0]
+        cache = self.client.caches.create(
+            model=model_name,
+            config=types.CreateCachedContentConfig(
+                display_name=f"youtube-briefing-{category}-{model_name}",
+                system_instruction=system_instruction,
+                ttl=f"{self.ttl_seconds}s"
+            )
+        )
+        self._entries[key] = {'name': cache.name, 'expires_at': self.clock() + self.ttl_seconds}
+        print(f"  [컨텍스트 캐시 생성] {category} / {model_name}")
+        return cache.name
+
+    def _refresh(self, key):
+        entry = self._entries[key]
+        self.client.caches.update(
+            name=entry['name'],
+            config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s")
+        )
+        entry['expires_at'] = self.clock() + self.ttl_seconds
+        return entry['name']
+
+    def get(self, category, model_name, system_instruction):
+        """사용할 캐시 이름을 반환합니다. 캐시를 쓸 수 없으면 None을 반환합니다."""
+        key = (category, model_name)
+        now = self.clock()
+
+        if self._disabled_until.get(key, 0) > now:
+            return None
+        if not self._is_large_enough(key, model_name, system_instruction):
+            return None
+
+        entry = self._entries.get(key)
+        try:
+            if entry and now < entry['expires_at'] - self.refresh_margin_seconds:
+                return entry['name']
+            if entry and now < entry['expires_at']:
+                return self._refresh(key)
+            return self._create(key, model_name, system_instruction)
+        except Exception as e:
+            print(f"  [컨텍스트 캐시 사용 불가] {category} / {model_name}: {str(e)}")
+            self._entries.pop(key, None)
+            self._disabled_until[key] = now + self.retry_after_seconds
+            return None
+
+    def invalidate(self, category, model_name):
+        """캐시가 서버에서 사라진 경우 등, 다음 호출에서 새로 만들도록 항목을 지웁니다."""
+        self._entries.pop((category, model_name), None)
+
+    def close(self):
+        """남은 캐시를 삭제하여 보관 비용이 계속 청구되지 않도록 합니다."""
+        for entry in self._entries.values():
+            try:
+                self.client.caches.delete(name=entry['name'])
+            except Exception as e:
+                print(f"  [컨텍스트 캐시 삭제 실패] {entry['name']}: {str(e)}")
+        self._entries = {}
+
 class GeminiAnalyzer:
-    def __init__(self):
+    def __init__(self, use_context_cache=True):
         self.api_key = os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             print("[경고] .env 파일에 GEMINI_API_KEY가 없습니다.")
         self.client = genai.Client(api_key=self.api_key)
+        self.context_cache = GeminiContextCache(self.client) if use_context_cache else None
+        # 마지막 호출의 모델과 토큰 사용량 (예산 집계용)
+        self.last_usage = None
+        # 이 인스턴스가 사용한 누적 토큰 (여러 프로필이 같은 키를 공유할 때 예산 배분용)
+        self.tokens_used = 0
+        # 여러 프로필이 같은 영상을 분석할 때 재사용하는 결과 캐시 (enable_result_cache로 활성화)
+        self._result_cache = None
+
+    def enable_result_cache(self):
+        """
+        한 프로세스에서 여러 프로필을 실행할 때 (videoId, 카테고리, 모델, 자막 사용 여부)가 같은 분석은 한 번만 호출합니다.
+        캐시에서 반환한 분석은 토큰을 쓰지 않으므로 last_usage를 None으로 둡니다.
+        """
+        self._result_cache = {}
 
     def _get_system_instruction(self, category):
         base = (
@@ -109,43 +252,116 @@ class GeminiAnalyzer:
             "required": ["investment", "affairs", "science", "insight", "htmlBody"]
         }
 
-    def analyze_video(self, video_data, model_name):
-        schema = self._get_analysis_schema()
-        system_instruction = self._get_system_instruction(video_data['category'])
-        
+    def _build_analysis_prompt(self, video_data, use_transcript=True):
         prompt = f"아래 영상 텍스트에서 신호와 소음을 분리 분석하십시오.\n\n제목: {video_data['title']}\n채널: {video_data['channel']}\n"
         
-        if video_data.get('transcript'):
-            prompt += f"\n[전체 자막 스크립트]\n{video_data['transcript'][:30000]}"
+        if use_transcript and video_data.get('transcript'):
+            prompt += f"\n[전체 자막 스크립트]\n{video_data['transcript'][:MAX_TRANSCRIPT_CHARS]}"
         else:
             prompt += f"\n[영상 설명]\n{video_data['description']}"
+        return prompt
+
+    def estimate_tokens(self, text):
+        return int(len(text) / CHARS_PER_TOKEN)
+
+    def estimate_analysis_tokens(self, video_data, use_transcript=True):
+        """API 호출 없이 분석 1건의 입출력 토큰 사용량을 추정합니다."""
+        text = self._get_system_instruction(video_data['category']) + self._build_analysis_prompt(video_data, use_transcript)
+        return self.estimate_tokens(text) + RESPONSE_TOKEN_OVERHEAD
+
+    def _record_usage(self, response, model_name, estimated_tokens):
+        usage = getattr(response, 'usage_metadata', None)
+        total = getattr(usage, 'total_token_count', None) if usage else None
+        self.last_usage = {'model': model_name, 'tokens': total or estimated_tokens}
+        self.tokens_used += self.last_usage['tokens']
+
+    def analyze_video(self, video_data, model_name, use_transcript=True):
+        schema = self._get_analysis_schema()
+        system_instruction = self._get_system_instruction(video_data['category'])
+        prompt = self._build_analysis_prompt(video_data, use_transcript)
+        self.last_usage = None
+
+        result_key = (video_data.get('videoId'), video_data['category'], model_name, use_transcript)
+        if self._result_cache is not None and result_key in self._result_cache:
+            print("  [분석 결과 공유 캐시 사용]")
+            return copy.deepcopy(self._result_cache[result_key])
+
+        cached_name = None
+        if self.context_cache:
+            cached_name = self.context_cache.get(video_data['category'], model_name, system_instruction)
 
         try:
-            response = self.client.models.generate_content(
-                model=model_name,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=system_instruction,
-                    response_mime_type="application/json",
-                    response_schema=schema
-                )
-            )
+            try:
+                response = self._generate_analysis(model_name, prompt, system_instruction, schema, cached_name)
+            except Exception as e:
+                if not cached_name or not self._is_cache_error(e):
+                    raise
+                # 캐시가 만료/삭제된 경우 캐시 없이 한 번 더 호출합니다.
+                print(f"  [컨텍스트 캐시 호출 실패, 일반 호출로 재시도] {str(e)}")
+                self.context_cache.invalidate(video_data['category'], model_name)
+                response = self._generate_analysis(model_name, prompt, system_instruction, schema, None)
+            self._record_usage(response, model_name, self.estimate_tokens(system_instruction + prompt) + RESPONSE_TOKEN_OVERHEAD)
             
             result = json.loads(response.text)
+            if self._result_cache is not None:
+                self._result_cache[result_key] = copy.deepcopy(result)
             return result
         except Exception as e:
             print(f"  [분석 실패] {video_data['title']}: {str(e)}")
             return None
 
-    def generate_briefing(self, summaries, model_name):
-        schema = self._get_briefing_schema()
-        
-        prompt = (
+    def _is_cache_error(self, error):
+        """
+        캐시를 찾을 수 없거나(404, 만료 후 400) 접근 권한이 없는(403) 오류인지 판단합니다.
+        429/5xx 같은 속도 제한/서버 오류는 캐시 없이 재호출하면 호출 수만 늘어나므로 제외합니다.
+        """
+        code = getattr(error, 'code', None)
+        if code in (403, 404):
+            return True
+        return code == 400 and 'cache' in str(error).lower()
+
+    def _generate_analysis(self, model_name, prompt, system_instruction, schema, cached_name):
+        if cached_name:
+            # 시스템 지시문은 캐시에 포함되어 있으므로 캐시 이름만 전달합니다.
+            # response_schema는 캐시할 수 없는 생성 설정이라 캐시를 쓰더라도 매번 함께 보냅니다.
+            config = types.GenerateContentConfig(
+                cached_content=cached_name,
+                response_mime_type="application/json",
+                response_schema=schema
+            )
+        else:
+            config = types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                response_mime_type="application/json",
+                response_schema=schema
+            )
+        return self.client.models.generate_content(model=model_name, contents=prompt, config=config)
+
+    def close(self):
+        if self.context_cache:
+            self.context_cache.close()
+
+    def _build_briefing_prompt(self, summaries):
+        compact = [
+            {k: v for k, v in summary.items() if k not in BRIEFING_EXCLUDED_FIELDS}
+            for summary in summaries
+        ]
+        return (
             "아래 영상 요약을 바탕으로 '오늘의 브리핑'을 작성해줘.\n"
             "카테고리별 핵심 3줄 + 주요 시사점 1줄 + Blogger HTML 본문.\n\n"
-            f"{json.dumps(summaries, ensure_ascii=False)}"
+            f"{json.dumps(compact, ensure_ascii=False, default=str)}"
         )
 
+    def estimate_briefing_tokens(self, summaries):
+        """API 호출 없이 통합 브리핑 1건의 입출력 토큰 사용량을 추정합니다."""
+        return self.estimate_tokens(self._build_briefing_prompt(summaries)) + RESPONSE_TOKEN_OVERHEAD
+
+    def generate_briefing(self, summaries, model_name):
+        schema = self._get_briefing_schema()
+        
+        prompt = self._build_briefing_prompt(summaries)
+        self.last_usage = None
+
         try:
             response = self.client.models.generate_content(
                 model=model_name,
@@ -155,6 +371,7 @@ class GeminiAnalyzer:
                     response_schema=schema
                 )
             )
+            self._record_usage(response, model_name, self.estimate_tokens(prompt) + RESPONSE_TOKEN_OVERHEAD)
             
             result = json.loads(response.text)
             return result
@@ -1,5 +1,6 @@
 import os
 import re
+import json
 from datetime import datetime, timezone, timedelta
 from googleapiclient.discovery import build
 from youtube_transcript_api import YouTubeTranscriptApi
@@ -13,6 +14,23 @@ class YouTubeAgent:
         
         self.youtube = build('youtube', 'v3', developerKey=api_key)
         self.formatter = TextFormatter()
+        # 이 인스턴스가 소모한 YouTube Data API 쿼터 단위 (search 100, list 1)
+        self.quota_used = 0
+        # 여러 프로필이 같은 채널을 다룰 때 재사용하는 실행 단위 캐시 (enable_shared_cache로 활성화)
+        self._channel_cache = None
+        self._fetch_cache = None
+        self._transcript_cache = None
+
+    def enable_shared_cache(self):
+        """
+        한 프로세스에서 여러 프로필을 실행할 때, 같은 채널 검색/영상 수집/자막 추출을 한 번만 수행합니다.
+        - 채널 ID 검색: Handle 기준
+        - 영상 수집: (재생목록, 필터 조건) 기준
+        - 자막: videoId 기준 (추출 실패도 기록하여 다시 요청하지 않습니다)
+        """
+        self._channel_cache = {}
+        self._fetch_cache = {}
+        self._transcript_cache = {}
 
     def _parse_duration_to_seconds(self, duration_str):
         match = re.match(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', duration_str)
@@ -43,7 +61,13 @@ class YouTubeAgent:
             channel_id = row.get('ChannelID', '')
             
             if handle and not channel_id:
+                if self._channel_cache is not None and handle in self._channel_cache:
+                    row['ChannelID'], row['UploadsID'] = self._channel_cache[handle]
+                    updated = True
+                    print(f"[설정 업데이트] {handle} -> {row['ChannelID']} (공유 캐시)")
+                    continue
                 try:
+                    self.quota_used += 100
                     response = self.youtube.search().list(
                         part='snippet',
                         q=handle,
@@ -57,6 +81,8 @@ class YouTubeAgent:
                         
                         row['ChannelID'] = found_id
                         row['UploadsID'] = uploads_id
+                        if self._channel_cache is not None:
+                            self._channel_cache[handle] = (found_id, uploads_id)
                         updated = True
                         print(f"[설정 업데이트] {handle} -> {found_id}")
                 except Exception as e:
@@ -79,16 +105,21 @@ class YouTubeAgent:
             if not playlist_id:
                 continue
                 
+            cache_key = (playlist_id, criteria)
             try:
-                if 'newest' in criteria:
+                if self._fetch_cache is not None and cache_key in self._fetch_cache:
+                    video = self._fetch_cache[cache_key]
+                elif 'newest' in criteria:
                     video = self._fetch_newest(playlist_id, cutoff_time)
-                    if video:
-                        self._append_video_info(results, video, category, channel)
-                
                 elif 'most viewed' in criteria:
                     video = self._fetch_most_viewed(playlist_id, cutoff_time)
-                    if video:
-                        self._append_video_info(results, video, category, channel)
+                else:
+                    video = None
+
+                if self._fetch_cache is not None:
+                    self._fetch_cache[cache_key] = video
+                if video:
+                    self._append_video_info(results, video, category, channel)
                         
             except Exception as e:
                 print(f"[수집 에러] {channel}: {str(e)}")
@@ -96,6 +127,7 @@ class YouTubeAgent:
         return results
 
     def _fetch_newest(self, playlist_id, cutoff_time):
+        self.quota_used += 1
         response = self.youtube.playlistItems().list(
             part='contentDetails',
             playlistId=playlist_id,
@@ -108,6 +140,7 @@ class YouTubeAgent:
             
         video_ids = [item['contentDetails']['videoId'] for item in items]
         
+        self.quota_used += 1
         video_response = self.youtube.videos().list(
             part='snippet,contentDetails',
             id=','.join(video_ids)
@@ -129,6 +162,7 @@ class YouTubeAgent:
         return None
 
     def _fetch_most_viewed(self, playlist_id, cutoff_time):
+        self.quota_used += 1
         list_response = self.youtube.playlistItems().list(
             part='contentDetails',
             playlistId=playlist_id,
@@ -139,6 +173,7 @@ class YouTubeAgent:
         if not video_ids:
             return None
             
+        self.quota_used += 1
         video_response = self.youtube.videos().list(
             part='snippet,statistics,contentDetails',
             id=','.join(video_ids)
@@ -164,6 +199,22 @@ class YouTubeAgent:
             
         return None
 
+    def get_recent_upload_times(self, playlist_id, max_results=20):
+        # 업로드 주기 추정용: 최근 업로드 영상의 게시 시각을 최신순으로 반환합니다. (쿼터 1 unit)
+        self.quota_used += 1
+        response = self.youtube.playlistItems().list(
+            part='contentDetails',
+            playlistId=playlist_id,
+            maxResults=max_results
+        ).execute()
+        
+        times = []
+        for item in response.get('items', []):
+            pub_str = item['contentDetails'].get('videoPublishedAt')
+            if pub_str:
+                times.append(datetime.fromisoformat(pub_str.replace('Z', '+00:00')))
+        return sorted(times, reverse=True)
+
     def _append_video_info(self, results, video_item, category, channel):
         snippet = video_item['snippet']
         
@@ -185,14 +236,26 @@ class YouTubeAgent:
             'thumbnailUrl': thumbnail_url
         })
 
-    def extract_transcript(self, video_id):
+    def extract_transcript(self, video_id, include_raw=False):
+        # include_raw=True이면 (전처리 텍스트, 타임스탬프 포함 원본 JSON) 튜플을 반환합니다.
+        if self._transcript_cache is not None and video_id in self._transcript_cache:
+            text_formatted, raw = self._transcript_cache[video_id]
+            print(f"  [자막 공유 캐시 사용] {video_id}")
+            return (text_formatted, raw) if include_raw else text_formatted
         try:
             ytt_api = YouTubeTranscriptApi()
             transcript_data = ytt_api.fetch(video_id, languages=['ko', 'en'])
             
             text_formatted = self.formatter.format_transcript(transcript_data)
             print(f"  [자막 확보 완료] {video_id}")
+            raw = json.dumps(transcript_data.to_raw_data(), ensure_ascii=False)
+            if self._transcript_cache is not None:
+                self._transcript_cache[video_id] = (text_formatted, raw)
+            if include_raw:
+                return text_formatted, raw
             return text_formatted
         except Exception as e:
             print(f"  [자막 없음/추출 실패] {video_id}: {str(e)}")
-            return None
\ No newline at end of file
+            if self._transcript_cache is not None:
+                self._transcript_cache[video_id] = (None, None)
+            return (None, None) if include_raw else None
\ No newline at end of file
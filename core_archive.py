@@ -0,0 +1,220 @@
+import zlib
+import codecs
+from collections import Counter
+from datetime import datetime
+
+# zlib 사전은 32KB 윈도우 안에서만 참조되므로 그 이상은 의미가 없습니다.
+MAX_DICT_SIZE = 32768
+
+
+class TranscriptArchive:
+    def __init__(self, conn, min_train_samples=30, compression_level=9):
+        """
+        자막 원본(타임스탬프 포함 JSON)과 전처리 텍스트를 zlib으로 압축하여 SQLite에 보관합니다.
+        한국어 자막에서 자주 나오는 어절로 학습한 사전(zdict)을 사용해 짧은 자막의 압축률을 높이고,
+        읽을 때는 sqlite3 blob I/O로 조금씩 읽으며 그때그때 압축을 해제합니다.
+        """
+        self.conn = conn
+        self.min_train_samples = min_train_samples
+        self.compression_level = compression_level
+        self._dict_cache = {}
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            cursor = self.conn.cursor()
+
+            # 압축 사전 테이블 (transcript_dict)
+            # 새 사전을 학습해도 기존 행은 자신이 압축될 때 사용한 dict_id로 복원됩니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_dict (
+                    dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    sample_count INTEGER,
+                    data BLOB NOT NULL
+                )
+            ''')
+
+            # 자막 보관 테이블 (transcript_archive)
+            # kind: 'raw' (타임스탬프 포함 JSON) | 'text' (분석에 사용한 전처리 텍스트)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_archive (
+                    video_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    dict_id INTEGER,
+                    raw_size INTEGER NOT NULL,
+                    compressed_size INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (video_id, kind)
+                )
+            ''')
+
+    def _load_dict(self, dict_id):
+        if dict_id is None:
+            return None
+        if dict_id not in self._dict_cache:
+            row = self.conn.execute("SELECT data FROM transcript_dict WHERE dict_id = ?", (dict_id,)).fetchone()
+            self._dict_cache[dict_id] = bytes(row[0]) if row else None
+        return self._dict_cache[dict_id]
+
+    def _latest_dict_id(self):
+        row = self.conn.execute("SELECT MAX(dict_id) FROM transcript_dict").fetchone()
+        return row[0]
+
+    def _compress(self, text, dict_id):
+        zdict = self._load_dict(dict_id)
+        if zdict:
+            compressor = zlib.compressobj(self.compression_level, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(self.compression_level)
+        return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+    def store(self, video_id, text, raw=None):
+        """
+        전처리 텍스트와 (있다면) 원본 JSON을 압축 저장합니다.
+        같은 영상을 다시 저장하면 최신 내용으로 덮어씁니다.
+        """
+        if not text:
+            return
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        dict_id = self._latest_dict_id()
+
+        with self.conn:
+            for kind, content in (('text', text), ('raw', raw)):
+                if not content:
+                    continue
+                data = self._compress(content, dict_id)
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO transcript_archive (
+                        video_id, kind, date, codec, dict_id, raw_size, compressed_size, data
+                    ) VALUES (?, ?, ?, 'zlib', ?, ?, ?, ?)
+                ''', (video_id, kind, today, dict_id, len(content.encode('utf-8')), len(data), data))
+
+        if dict_id is None:
+            self.maybe_train_dictionary()
+
+    def has(self, video_id, kind='text'):
+        row = self.conn.execute(
+            "SELECT 1 FROM transcript_archive WHERE video_id = ? AND kind = ?", (video_id, kind)
+        ).fetchone()
+        return row is not None
+
+    def iter_text(self, video_id, kind='text', chunk_size=65536):
+        """
+        보관된 자막을 chunk_size 바이트씩 blob에서 읽어 압축을 풀며 문자열 조각으로 내보냅니다.
+        전체 문자열이 필요 없는 검색/스트리밍 용도에서는 메모리에 한 번에 올리지 않습니다.
+        """
+        row = self.conn.execute(
+            "SELECT rowid, dict_id FROM transcript_archive WHERE video_id = ? AND kind = ?", (video_id, kind)
+        ).fetchone()
+        if row is None:
+            return
+
+        zdict = self._load_dict(row[1])
+        decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder('utf-8')()
+
+        with self.conn.blobopen('transcript_archive', 'data', row[0], readonly=True) as blob:
+            while True:
+                chunk = blob.read(chunk_size)
+                if not chunk:
+                    break
+                text = decoder.decode(decompressor.decompress(chunk))
+                if text:
+                    yield text
+
+        tail = decoder.decode(decompressor.flush(), final=True)
+        if tail:
+            yield tail
+
+    def get_text(self, video_id, kind='text'):
+        """보관된 자막 전체를 문자열로 반환합니다. 없으면 None을 반환합니다."""
+        if not self.has(video_id, kind):
+            return None
+        return ''.join(self.iter_text(video_id, kind))
+
+    def _iter_recent_texts(self, limit):
+        rows = self.conn.execute(
+            "SELECT video_id FROM transcript_archive WHERE kind = 'text' ORDER BY date DESC LIMIT ?", (limit,)
+        ).fetchall()
+        for row in rows:
+            yield self.get_text(row[0])
+
+    def maybe_train_dictionary(self):
+        """사전이 아직 없고 학습용 자막이 충분히 쌓였으면 첫 사전을 학습합니다."""
+        if self._latest_dict_id() is not None:
+            return None
+        count = self.conn.execute("SELECT COUNT(*) FROM transcript_archive WHERE kind = 'text'").fetchone()[0]
+        if count < self.min_train_samples:
+            return None
+        return self.train_dictionary()
+
+    def train_dictionary(self, sample_limit=200, dict_size=MAX_DICT_SIZE):
+        """
+        최근 자막에서 자주 반복되는 어절과 두 어절 구(句)를 골라 zlib 사전을 만듭니다.
+        (빈도 x 길이)로 절약 효과가 큰 조각을 고르고, zlib은 윈도우 끝에 가까운 데이터를
+        더 짧은 거리로 참조하므로 효과가 큰 조각일수록 사전 뒤쪽에 배치합니다.
+        이후 저장되는 자막부터 새 사전이 적용됩니다.
+        """
+        counter = Counter()
+        sample_count = 0
+        for text in self._iter_recent_texts(sample_limit):
+            words = text.split()
+            counter.update(words)
+            counter.update(' '.join(pair) for pair in zip(words, words[1:]))
+            sample_count += 1
+
+        scored = [
+            (count * len(piece.encode('utf-8')), piece)
+            for piece, count in counter.items()
+            if count > 1 and len(piece) > 1
+        ]
+        scored.sort(reverse=True)
+
+        pieces = []
+        size = 0
+        for _, piece in scored:
+            encoded = (piece + '\n').encode('utf-8')
+            if size + len(encoded) > dict_size:
+                break
+            pieces.append(encoded)
+            size += len(encoded)
+
+        if not pieces:
+            return None
+
+        zdict = b''.join(reversed(pieces))
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO transcript_dict (created_at, sample_count, data) VALUES (?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), sample_count, zdict)
+            )
+        print(f"💾 자막 압축 사전 학습 완료: {sample_count}개 자막, {len(zdict)} bytes")
+        return cursor.lastrowid
+
+    def get_average_text_size_by_channel(self):
+        """채널별 보관 자막(전처리 텍스트)의 평균 원본 크기(bytes)를 반환합니다. (비용 추정용)"""
+        rows = self.conn.execute('''
+            SELECT d.channel, AVG(a.raw_size)
+            FROM transcript_archive a JOIN detail d ON d.video_id = a.video_id
+            WHERE a.kind = 'text'
+            GROUP BY d.channel
+        ''').fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def get_stats(self):
+        """보관된 자막 수와 원본/압축 크기, 압축률(압축 크기 / 원본 크기)을 반환합니다."""
+        row = self.conn.execute('''
+            SELECT COUNT(DISTINCT video_id), COALESCE(SUM(raw_size), 0), COALESCE(SUM(compressed_size), 0)
+            FROM transcript_archive
+        ''').fetchone()
+        videos, raw_size, compressed_size = row
+        return {
+            'videos': videos,
+            'raw_size': raw_size,
+            'compressed_size': compressed_size,
+            'ratio': round(compressed_size / raw_size, 4) if raw_size else None
+        }
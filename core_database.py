@@ -1,6 +1,31 @@
 import sqlite3
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+
+# 집계 테이블에서 개별 컬럼으로 관리하는 등급 목록 (그 외 값은 grade_other로 집계)
+GRADES = ['A', 'B', 'C', 'D', 'F']
+
+
+def parse_signal_ratio(value):
+    """
+    '72%' 같은 신호 비율 문자열을 0~100 범위의 실수로 변환합니다.
+    해석할 수 없는 값(N/A 등)은 None을 반환합니다.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        ratio = float(value)
+    else:
+        text = str(value).strip()
+        has_percent = text.endswith('%')
+        try:
+            ratio = float(text.rstrip('%').strip())
+        except ValueError:
+            return None
+        if not has_percent and 0 <= ratio <= 1:
+            ratio *= 100
+    return max(0.0, min(100.0, ratio))
+
 
 class SQLiteManager:
     def __init__(self, db_path="youtube_briefing.db"):
@@ -37,9 +62,13 @@ class SQLiteManager:
                     signal_ratio TEXT,
                     reasoning TEXT,
                     thumbnail_url TEXT,
-                    video_url TEXT
+                    video_url TEXT,
+                    analysis_source TEXT DEFAULT 'transcript',
+                    change_seq INTEGER
                 )
             ''')
+            # analysis_source: 'transcript' (자막 분석) | 'description' (설명만 분석한 저가 등급)
+            self._ensure_column(cursor, 'detail', 'analysis_source', "TEXT DEFAULT 'transcript'")
 
             # 일간 통합 브리핑 테이블 (daily)
             cursor.execute('''
@@ -49,19 +78,228 @@ class SQLiteManager:
                     affairs TEXT,
                     science TEXT,
                     insight TEXT,
-                    html_body TEXT
+                    html_body TEXT,
+                    change_seq INTEGER
+                )
+            ''')
+
+            # 행이 추가/교체될 때마다 증가하는 테이블별 변경 순번 (change_sequence)
+            # rowid는 VACUUM으로 다시 매겨질 수 있으므로 증분 내보내기는 change_seq를 기준으로 합니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS change_sequence (
+                    table_name TEXT PRIMARY KEY,
+                    seq INTEGER NOT NULL
+                )
+            ''')
+            for table in ('detail', 'daily'):
+                self._ensure_change_seq(cursor, table)
+
+            # 근접 중복 영상 연결 테이블 (duplicate)
+            # 대표 영상만 분석하고, 나머지는 대표 영상 ID에 연결만 해 둡니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS duplicate (
+                    video_id TEXT PRIMARY KEY,
+                    representative_id TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    category TEXT,
+                    channel TEXT,
+                    title TEXT,
+                    similarity REAL,
+                    video_url TEXT
+                )
+            ''')
+
+            # 채널/카테고리별 일 단위 품질 집계 테이블 (quality_daily)
+            # save_detail_analysis와 같은 트랜잭션에서 증분 갱신되며,
+            # 7/30/90일 롤링 통계는 일 단위 버킷을 합산하여 즉시 계산합니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS quality_daily (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    video_count INTEGER NOT NULL DEFAULT 0,
+                    score_sum INTEGER NOT NULL DEFAULT 0,
+                    signal_sum REAL NOT NULL DEFAULT 0,
+                    signal_count INTEGER NOT NULL DEFAULT 0,
+                    grade_a INTEGER NOT NULL DEFAULT 0,
+                    grade_b INTEGER NOT NULL DEFAULT 0,
+                    grade_c INTEGER NOT NULL DEFAULT 0,
+                    grade_d INTEGER NOT NULL DEFAULT 0,
+                    grade_f INTEGER NOT NULL DEFAULT 0,
+                    grade_other INTEGER NOT NULL DEFAULT 0,
+                    transcript_count INTEGER NOT NULL DEFAULT 0,
+                    transcript_score_sum INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (scope, key, date)
+                )
+            ''')
+            # 자막 기반 분석만 따로 누적한 값은 라우팅 이력으로 사용합니다. (설명만 분석한 점수 제외)
+            added = self._ensure_column(cursor, 'quality_daily', 'transcript_count', "INTEGER NOT NULL DEFAULT 0")
+            added |= self._ensure_column(cursor, 'quality_daily', 'transcript_score_sum', "INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_quality_daily_scope_date ON quality_daily (scope, date)")
+
+            # 일간 API 사용량 테이블 (api_usage)
+            # resource에는 Gemini 모델명 등 예산을 관리할 자원 이름이 들어갑니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS api_usage (
+                    date TEXT NOT NULL,
+                    resource TEXT NOT NULL,
+                    amount INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (date, resource)
+                )
+            ''')
+
+            # 파이프라인 상태 테이블 (pipeline_state)
+            # 데몬의 마지막 브리핑 변경 순번처럼 실행 사이에 이어지는 작은 값을 보관합니다.
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pipeline_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
                 )
             ''')
 
+            # 집계 테이블이 새로 생긴 기존 DB라면 detail 테이블로부터 한 번 채워 넣습니다.
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM quality_daily) AS filled, EXISTS (SELECT 1 FROM detail) AS has_detail")
+            row = cursor.fetchone()
+            if (added or not row['filled']) and row['has_detail']:
+                self._rebuild_quality_aggregates(cursor)
+
+    def _ensure_change_seq(self, cursor, table):
+        """table에 change_seq 컬럼과 이를 채우는 트리거를 준비합니다. 기존 행은 rowid 순서로 채웁니다."""
+        if self._ensure_column(cursor, table, 'change_seq', 'INTEGER'):
+            cursor.execute(f"UPDATE {table} SET change_seq = rowid")
+        cursor.execute(f'''
+            INSERT OR IGNORE INTO change_sequence (table_name, seq)
+            SELECT '{table}', COALESCE(MAX(change_seq), 0) FROM {table}
+        ''')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_change_seq ON {table} (change_seq)")
+
+        # INSERT OR REPLACE는 기존 행 삭제 후 삽입이므로 INSERT 트리거로 교체까지 처리됩니다.
+        for event, condition in (('INSERT', ''), ('UPDATE', 'WHEN NEW.change_seq IS OLD.change_seq')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_change_seq_{event.lower()}
+                AFTER {event} ON {table} {condition}
+                BEGIN
+                    UPDATE change_sequence SET seq = seq + 1 WHERE table_name = '{table}';
+                    UPDATE {table} SET change_seq = (
+                        SELECT seq FROM change_sequence WHERE table_name = '{table}'
+                    ) WHERE rowid = NEW.rowid;
+                END
+            ''')
+
+    def _ensure_column(self, cursor, table, column, definition):
+        """기존 DB에 없는 컬럼을 추가합니다. 추가했으면 True를 반환합니다."""
+        columns = {row['name'] for row in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+        if column in columns:
+            return False
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return True
+
+    def _update_quality_aggregates(self, cursor, date, category, channel, score, grade, signal_ratio,
+                                   analysis_source='transcript'):
+        """
+        영상 1건의 평가 결과를 채널/카테고리 일 단위 버킷에 누적합니다.
+        호출자의 트랜잭션 안에서 실행되어야 detail 테이블과 집계가 항상 일치합니다.
+        """
+        ratio = parse_signal_ratio(signal_ratio)
+        from_transcript = 1 if (analysis_source or 'transcript') == 'transcript' else 0
+        grade = (grade or '').strip().upper()[:1]
+        grade_column = f"grade_{grade.lower()}" if grade in GRADES else 'grade_other'
+
+        for scope, key in (('channel', channel), ('category', category)):
+            if not key:
+                continue
+            cursor.execute(f'''
+                INSERT INTO quality_daily (
+                    scope, key, date, video_count, score_sum, signal_sum, signal_count, {grade_column},
+                    transcript_count, transcript_score_sum
+                ) VALUES (?, ?, ?, 1, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT (scope, key, date) DO UPDATE SET
+                    video_count = video_count + 1,
+                    score_sum = score_sum + excluded.score_sum,
+                    signal_sum = signal_sum + excluded.signal_sum,
+                    signal_count = signal_count + excluded.signal_count,
+                    {grade_column} = {grade_column} + 1,
+                    transcript_count = transcript_count + excluded.transcript_count,
+                    transcript_score_sum = transcript_score_sum + excluded.transcript_score_sum
+            ''', (
+                scope, key, date,
+                int(score or 0),
+                ratio if ratio is not None else 0.0,
+                1 if ratio is not None else 0,
+                from_transcript,
+                int(score or 0) * from_transcript
+            ))
+
+    def _rebuild_quality_aggregates(self, cursor):
+        """detail 테이블 전체를 다시 읽어 집계 테이블을 재구성합니다."""
+        cursor.execute("DELETE FROM quality_daily")
+        rows = cursor.execute(
+            "SELECT date, category, channel, score, grade, signal_ratio, analysis_source FROM detail"
+        ).fetchall()
+        for row in rows:
+            self._update_quality_aggregates(
+                cursor, row['date'], row['category'], row['channel'],
+                row['score'], row['grade'], row['signal_ratio'], row['analysis_source']
+            )
+
+    def rebuild_quality_aggregates(self):
+        """집계 테이블을 detail 테이블 기준으로 재구성합니다. (수동 보정용)"""
+        with self.conn:
+            self._rebuild_quality_aggregates(self.conn.cursor())
+        print("💾 품질 집계 테이블 재구성 완료.")
+
     def get_processed_video_ids(self):
         """
         이미 처리된 영상의 ID 목록을 반환합니다. (Phase 2에서 중복 수집 필터링에 사용)
         """
         cursor = self.conn.cursor()
-        cursor.execute("SELECT video_id FROM detail")
+        # 중복으로 연결된 영상도 처리된 것으로 간주하여 다시 분석하지 않습니다.
+        cursor.execute("SELECT video_id FROM detail UNION SELECT video_id FROM duplicate")
         # 결과를 문자열 리스트로 변환하여 반환
         return [row['video_id'] for row in cursor.fetchall()]
 
+    def get_detail_by_date(self, date=None):
+        """
+        지정한 날짜(기본: 오늘)에 저장된 개별 영상 분석 결과를 딕셔너리 리스트로 반환합니다.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM detail WHERE date = ?", (date,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_detail_since(self, change_seq):
+        """
+        change_seq가 주어진 값보다 큰(그 이후 저장된) 개별 영상 분석 결과를 저장 순서대로 반환합니다.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM detail WHERE change_seq > ? ORDER BY change_seq", (int(change_seq),))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def has_daily_briefing(self, date=None):
+        """
+        지정한 날짜(기본: 오늘)의 통합 브리핑이 이미 저장되어 있는지 확인합니다.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM daily WHERE date = ?", (date,))
+        return cursor.fetchone() is not None
+
+    def get_state(self, key, default=None):
+        """
+        pipeline_state에 저장된 값을 반환합니다. 없으면 default를 반환합니다.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM pipeline_state WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row['value'] if row else default
+
+    def set_state(self, key, value):
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO pipeline_state (key, value) VALUES (?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value
+            ''', (key, str(value)))
+
     def save_detail_analysis(self, analysis):
         """
         Gemini가 분석한 개별 영상 데이터를 DB에 저장합니다.
@@ -82,8 +320,8 @@ class SQLiteManager:
                     video_id, date, category, channel, title, 
                     core_fact, actionable_insight, noise_analysis, 
                     score, grade, signal_ratio, reasoning, 
-                    thumbnail_url, video_url
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    thumbnail_url, video_url, analysis_source
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 analysis['videoId'],
                 today,
@@ -98,14 +336,43 @@ class SQLiteManager:
                 info_val.get('signal_ratio', 'N/A'),
                 info_val.get('reasoning', ''),
                 analysis['thumbnailUrl'],
-                f"https://youtube.com/watch?v={analysis['videoId']}"
+                f"https://youtube.com/watch?v={analysis['videoId']}",
+                analysis.get('analysis_source', 'transcript')
             ))
             
             if cursor.rowcount > 0:
+                self._update_quality_aggregates(
+                    cursor, today, analysis['category'], analysis['channel'],
+                    info_val.get('score', 0), info_val.get('grade', 'N/A'), info_val.get('signal_ratio', 'N/A'),
+                    analysis.get('analysis_source', 'transcript')
+                )
                 print(f"💾 DB 저장 완료: {analysis['title']}")
             else:
                 print(f"⚠️ 이미 DB에 존재하는 데이터입니다 (저장 생략): {analysis['title']}")
 
+    def save_duplicate_link(self, video, representative_id, similarity):
+        """
+        근접 중복으로 판정된 영상을 대표 영상에 연결하여 저장합니다.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO duplicate (
+                    video_id, representative_id, date, category, channel, title, similarity, video_url
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                video['videoId'],
+                representative_id,
+                today,
+                video.get('category'),
+                video.get('channel'),
+                video.get('title'),
+                round(similarity, 4),
+                f"https://youtube.com/watch?v={video['videoId']}"
+            ))
+
     def save_daily_briefing(self, briefing):
         """
         Gemini Pro가 생성한 일간 통합 브리핑 데이터를 DB에 저장합니다.
@@ -129,6 +396,118 @@ class SQLiteManager:
             ))
             print("💾 통합 브리핑 DB 저장 완료.")
 
+    def add_api_usage(self, resource, amount):
+        """
+        오늘 날짜의 자원 사용량을 누적합니다. (여러 번 실행해도 일 단위로 합산됩니다)
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        with self.conn:
+            self.conn.execute('''
+                INSERT INTO api_usage (date, resource, amount) VALUES (?, ?, ?)
+                ON CONFLICT (date, resource) DO UPDATE SET amount = amount + excluded.amount
+            ''', (today, resource, int(amount)))
+
+    def get_api_usage(self, resources=None, date=None):
+        """
+        지정한 날짜(기본: 오늘)의 자원 사용량 합계를 반환합니다.
+        resources를 생략하면 모든 자원의 합계를 반환합니다.
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        query = "SELECT COALESCE(SUM(amount), 0) AS total FROM api_usage WHERE date = ?"
+        params = [date]
+        if resources:
+            query += f" AND resource IN ({','.join('?' * len(resources))})"
+            params.extend(resources)
+
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchone()['total']
+
+    def _summarize_quality_row(self, row):
+        video_count = row['video_count'] or 0
+        return {
+            'key': row['key'],
+            'video_count': video_count,
+            'mean_score': round(row['score_sum'] / video_count, 2) if video_count else None,
+            'mean_signal_ratio': round(row['signal_sum'] / row['signal_count'], 2) if row['signal_count'] else None,
+            # 자막 기반 분석만의 표본 수와 평균 점수 (라우팅 이력)
+            'transcript_count': row['transcript_count'] or 0,
+            'transcript_mean_score': (
+                round(row['transcript_score_sum'] / row['transcript_count'], 2) if row['transcript_count'] else None
+            ),
+            'grades': {
+                **{g: row[f"grade_{g.lower()}"] for g in GRADES},
+                'other': row['grade_other']
+            }
+        }
+
+    def get_quality_summary(self, scope='channel', window_days=30, end_date=None, key=None):
+        """
+        최근 window_days일 동안의 채널(또는 카테고리)별 평균 점수, 신호 비율, 등급 분포를 반환합니다.
+        결과는 평균 점수 내림차순으로 정렬됩니다. key를 지정하면 해당 항목만 조회합니다.
+        """
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+        start_str = (end - timedelta(days=window_days - 1)).strftime("%Y-%m-%d")
+        end_str = end.strftime("%Y-%m-%d")
+
+        query = '''
+            SELECT key,
+                   SUM(video_count) AS video_count,
+                   SUM(score_sum) AS score_sum,
+                   SUM(signal_sum) AS signal_sum,
+                   SUM(signal_count) AS signal_count,
+                   SUM(grade_a) AS grade_a, SUM(grade_b) AS grade_b, SUM(grade_c) AS grade_c,
+                   SUM(grade_d) AS grade_d, SUM(grade_f) AS grade_f, SUM(grade_other) AS grade_other,
+                   SUM(transcript_count) AS transcript_count, SUM(transcript_score_sum) AS transcript_score_sum
+            FROM quality_daily
+            WHERE scope = ? AND date BETWEEN ? AND ?
+        '''
+        params = [scope, start_str, end_str]
+        if key is not None:
+            query += " AND key = ?"
+            params.append(key)
+        query += " GROUP BY key"
+
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        summaries = [self._summarize_quality_row(row) for row in cursor.fetchall()]
+        summaries.sort(key=lambda s: s['mean_score'] if s['mean_score'] is not None else -1, reverse=True)
+        return summaries
+
+    def get_rolling_quality(self, scope, key, windows=(7, 30, 90), end_date=None):
+        """
+        하나의 채널(또는 카테고리)에 대한 7/30/90일 롤링 통계를 {기간: 통계} 형태로 반환합니다.
+        해당 기간에 데이터가 없으면 None이 들어갑니다.
+        """
+        result = {}
+        for days in windows:
+            summary = self.get_quality_summary(scope, days, end_date, key=key)
+            result[days] = summary[0] if summary else None
+        return result
+
+    def get_quality_trend(self, scope, key, days=90, end_date=None):
+        """
+        추세 차트용으로 최근 days일 동안의 일별 평균 점수와 신호 비율을 날짜순으로 반환합니다.
+        """
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+        start_str = (end - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT date, video_count, score_sum, signal_sum, signal_count
+            FROM quality_daily
+            WHERE scope = ? AND key = ? AND date BETWEEN ? AND ?
+            ORDER BY date
+        ''', (scope, key, start_str, end.strftime("%Y-%m-%d")))
+
+        return [{
+            'date': row['date'],
+            'video_count': row['video_count'],
+            'mean_score': round(row['score_sum'] / row['video_count'], 2) if row['video_count'] else None,
+            'mean_signal_ratio': round(row['signal_sum'] / row['signal_count'], 2) if row['signal_count'] else None
+        } for row in cursor.fetchall()]
+
     def close(self):
         """DB 연결을 안전하게 종료합니다."""
         self.conn.close()
\ No newline at end of file
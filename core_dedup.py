@@ -0,0 +1,195 @@
+import re
+import zlib
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+# MinHash 순열에 사용하는 메르센 소수와 32비트 마스크
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# 분석 단계와 동일하게 자막 앞부분 30000자만 비교 대상으로 삼습니다.
+_MAX_TEXT_LENGTH = 30000
+
+
+def _normalize_text(text):
+    """
+    구두점과 공백 차이로 유사도가 흔들리지 않도록 텍스트를 정규화합니다.
+    한글/영문/숫자만 남기고 연속 공백은 하나로 합칩니다.
+    """
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def _make_permutations(num_perm, seed):
+    rng = random.Random(seed)
+    return [
+        (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+        for _ in range(num_perm)
+    ]
+
+
+def compute_minhash_signature(text, num_perm=128, shingle_size=5, seed=42):
+    """
+    문자 단위 n-gram(shingle) 집합에 대한 MinHash 시그니처를 계산합니다.
+    한국어 자막은 띄어쓰기가 불규칙하므로 단어 대신 문자 n-gram을 사용합니다.
+    프로세스 풀에서 실행되므로 모듈 최상위 함수로 둡니다.
+    """
+    text = _normalize_text(text[:_MAX_TEXT_LENGTH])
+    if len(text) < shingle_size:
+        return None
+
+    shingles = {
+        zlib.crc32(text[i:i + shingle_size].encode('utf-8'))
+        for i in range(len(text) - shingle_size + 1)
+    }
+
+    return [
+        min(((a * s + b) % _MERSENNE_PRIME) & _MAX_HASH for s in shingles)
+        for a, b in _make_permutations(num_perm, seed)
+    ]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """두 MinHash 시그니처가 일치하는 비율로 Jaccard 유사도를 추정합니다."""
+    matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return matches / len(sig_a)
+
+
+class NearDuplicateDetector:
+    def __init__(self, num_perm=128, bands=32, threshold=0.5, shingle_size=5, max_workers=None, seed=42):
+        """
+        MinHash + LSH 밴딩으로 같은 날 여러 채널이 다룬 동일 스토리를 묶습니다.
+        bands * rows = num_perm 이며, 후보 쌍은 추정 유사도가 threshold 이상일 때만 중복으로 판정합니다.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.max_workers = max_workers
+        self.seed = seed
+
+        self._executor = None
+        self._pending = []
+        self._buckets = {}
+        self._signatures = {}
+        self._categories = {}
+        # 중복으로 판정된 영상의 (카테고리, 시그니처). 대표 분석이 실패해 승격될 때 색인에 사용합니다.
+        self._member_signatures = {}
+
+    def _get_executor(self):
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            except (OSError, NotImplementedError) as e:
+                print(f"[경고] 프로세스 풀 생성 실패, 시그니처를 순차 계산합니다: {str(e)}")
+                self._executor = False
+        return self._executor
+
+    def _select_text(self, video):
+        if video.get('transcript'):
+            return video['transcript']
+        return f"{video.get('title', '')} {video.get('description', '')}"
+
+    def submit(self, video):
+        """
+        영상의 시그니처 계산을 프로세스 풀에 예약합니다.
+        자막 추출(I/O) 루프 안에서 호출하면 CPU 작업이 다음 자막 다운로드와 겹쳐 진행됩니다.
+        """
+        args = (self._select_text(video), self.num_perm, self.shingle_size, self.seed)
+        executor = self._get_executor()
+
+        if executor:
+            future = executor.submit(compute_minhash_signature, *args)
+            self._pending.append((video, future))
+        else:
+            self._pending.append((video, compute_minhash_signature(*args)))
+
+    def _band_keys(self, category, signature):
+        return [
+            (category, band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def _index(self, video_id, category, signature):
+        self._signatures[video_id] = signature
+        self._categories[video_id] = category
+        for key in self._band_keys(category, signature):
+            self._buckets.setdefault(key, []).append(video_id)
+
+    def cluster(self):
+        """
+        예약된 영상들을 클러스터링하여 (대표 영상 목록, 중복 목록)을 반환합니다.
+        중복 목록의 원소는 (영상, 대표 영상 ID, 추정 유사도) 튜플입니다.
+        자막이 긴 영상이 먼저 대표로 선정되며, 이전 호출에서 색인된 대표와도 비교합니다.
+        """
+        resolved = []
+        for video, result in self._pending:
+            signature = result.result() if hasattr(result, 'result') else result
+            resolved.append((video, signature))
+        self._pending = []
+
+        resolved.sort(key=lambda item: (-len(item[0].get('transcript') or ''), item[0].get('publishedAt', '')))
+
+        representatives = []
+        duplicates = []
+        for video, signature in resolved:
+            if signature is None:
+                representatives.append(video)
+                continue
+
+            category = video.get('category')
+            band_keys = self._band_keys(category, signature)
+
+            best_id, best_score = None, 0.0
+            candidates = set()
+            for key in band_keys:
+                candidates.update(self._buckets.get(key, []))
+            for candidate_id in candidates:
+                score = estimate_similarity(signature, self._signatures[candidate_id])
+                if score > best_score:
+                    best_id, best_score = candidate_id, score
+
+            if best_id is not None and best_score >= self.threshold:
+                duplicates.append((video, best_id, best_score))
+                self._member_signatures[video['videoId']] = (category, signature)
+                continue
+
+            self._index(video['videoId'], category, signature)
+            representatives.append(video)
+
+        return representatives, duplicates
+
+    def discard(self, video_id):
+        """대표 영상을 색인에서 제거합니다. (대표 분석이 실패해 클러스터가 저장되지 않은 경우)"""
+        signature = self._signatures.pop(video_id, None)
+        category = self._categories.pop(video_id, None)
+        if signature is None:
+            return
+        for key in self._band_keys(category, signature):
+            bucket = self._buckets.get(key)
+            if bucket and video_id in bucket:
+                bucket.remove(video_id)
+
+    def promote(self, old_id, new_id):
+        """대표 영상을 같은 클러스터의 다른 영상으로 교체하여 이후 영상이 새 대표와 비교되게 합니다."""
+        self.discard(old_id)
+        member = self._member_signatures.pop(new_id, None)
+        if member:
+            self._index(new_id, *member)
+
+    def reset(self):
+        """색인된 대표 시그니처를 비웁니다. (하루 단위로 색인을 새로 시작할 때 사용)"""
+        self._buckets = {}
+        self._signatures = {}
+        self._categories = {}
+        self._member_signatures = {}
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown()
+        self._executor = None
@@ -0,0 +1,181 @@
+import os
+import json
+import argparse
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+from core_database import SQLiteManager, parse_signal_ratio
+
+# 날짜 파티션 디렉토리(date=YYYY-MM-DD)에서 복원되므로 파일 안에는 date 컬럼을 넣지 않습니다.
+DETAIL_SCHEMA = pa.schema([
+    ('video_id', pa.string()),
+    ('category', pa.string()),
+    ('channel', pa.string()),
+    ('title', pa.string()),
+    ('core_fact', pa.list_(pa.string())),
+    ('actionable_insight', pa.list_(pa.string())),
+    ('noise_analysis', pa.list_(pa.struct([('quote', pa.string()), ('label', pa.string())]))),
+    ('score', pa.int32()),
+    ('grade', pa.string()),
+    ('signal_ratio', pa.float64()),
+    ('signal_ratio_text', pa.string()),
+    ('reasoning', pa.string()),
+    ('thumbnail_url', pa.string()),
+    ('video_url', pa.string()),
+])
+
+DAILY_SCHEMA = pa.schema([
+    ('investment', pa.string()),
+    ('affairs', pa.string()),
+    ('science', pa.string()),
+    ('insight', pa.string()),
+    ('html_body', pa.string()),
+])
+
+
+def _parse_json_list(value):
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (json.JSONDecodeError, TypeError):
+        return [value]
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+def _detail_record(row):
+    noise = []
+    for item in _parse_json_list(row['noise_analysis']):
+        if isinstance(item, dict):
+            noise.append({'quote': item.get('quote'), 'label': item.get('label')})
+        else:
+            noise.append({'quote': str(item), 'label': None})
+
+    return {
+        'video_id': row['video_id'],
+        'category': row['category'],
+        'channel': row['channel'],
+        'title': row['title'],
+        'core_fact': [str(f) for f in _parse_json_list(row['core_fact'])],
+        'actionable_insight': [str(i) for i in _parse_json_list(row['actionable_insight'])],
+        'noise_analysis': noise,
+        'score': row['score'],
+        'grade': row['grade'],
+        'signal_ratio': parse_signal_ratio(row['signal_ratio']),
+        'signal_ratio_text': row['signal_ratio'],
+        'reasoning': row['reasoning'],
+        'thumbnail_url': row['thumbnail_url'],
+        'video_url': row['video_url'],
+    }
+
+
+def _daily_record(row):
+    return {name: row[name] for name in DAILY_SCHEMA.names}
+
+
+class ParquetExporter:
+    # 테이블명 -> (스키마, 행 변환 함수)
+    TABLES = {
+        'detail': (DETAIL_SCHEMA, _detail_record),
+        'daily': (DAILY_SCHEMA, _daily_record),
+    }
+
+    def __init__(self, db, out_dir="export"):
+        """
+        detail/daily 테이블을 날짜별 Parquet 파티션(out_dir/<table>/date=YYYY-MM-DD/part-0.parquet)으로 내보냅니다.
+        테이블별 마지막 변경 순번(change_seq)을 워터마크로 기록하여, 이후 실행에서는 새로 추가되거나
+        교체된 행이 속한 날짜 파티션만 다시 씁니다. (rowid는 VACUUM으로 다시 매겨질 수 있어 사용하지 않습니다)
+        """
+        self.db = db
+        self.out_dir = out_dir
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.db.conn:
+            self.db.conn.execute('''
+                CREATE TABLE IF NOT EXISTS export_watermark (
+                    table_name TEXT PRIMARY KEY,
+                    last_seq INTEGER NOT NULL,
+                    exported_at TEXT NOT NULL
+                )
+            ''')
+            # 이전 버전은 rowid를 기록했습니다. change_seq는 기존 행의 rowid로 채워지므로 값은 그대로 이어 씁니다.
+            columns = {row['name'] for row in self.db.conn.execute("PRAGMA table_info(export_watermark)").fetchall()}
+            if 'last_rowid' in columns:
+                self.db.conn.execute("ALTER TABLE export_watermark RENAME COLUMN last_rowid TO last_seq")
+
+    def _get_watermark(self, table):
+        row = self.db.conn.execute(
+            "SELECT last_seq FROM export_watermark WHERE table_name = ?", (table,)
+        ).fetchone()
+        return row['last_seq'] if row else 0
+
+    def _set_watermark(self, table, last_seq):
+        with self.db.conn:
+            self.db.conn.execute('''
+                INSERT OR REPLACE INTO export_watermark (table_name, last_seq, exported_at)
+                VALUES (?, ?, ?)
+            ''', (table, last_seq, datetime.now().isoformat(timespec='seconds')))
+
+    def reset_watermarks(self):
+        """다음 실행에서 모든 파티션을 다시 쓰도록 워터마크를 초기화합니다."""
+        with self.db.conn:
+            self.db.conn.execute("DELETE FROM export_watermark")
+
+    def _write_partition(self, table, date, rows):
+        schema, to_record = self.TABLES[table]
+        arrow_table = pa.Table.from_pylist([to_record(row) for row in rows], schema=schema)
+
+        partition_dir = os.path.join(self.out_dir, table, f"date={date}")
+        os.makedirs(partition_dir, exist_ok=True)
+        target = os.path.join(partition_dir, "part-0.parquet")
+        temp = target + ".tmp"
+        # 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓴 뒤 교체합니다.
+        pq.write_table(arrow_table, temp, compression='zstd')
+        os.replace(temp, target)
+
+    def export_table(self, table):
+        """워터마크 이후 변경된 날짜 파티션을 다시 쓰고, 쓴 파티션 날짜 목록을 반환합니다."""
+        watermark = self._get_watermark(table)
+        cursor = self.db.conn.cursor()
+
+        cursor.execute(f"SELECT MAX(change_seq) AS max_seq FROM {table}")
+        max_seq = cursor.fetchone()['max_seq'] or 0
+        if max_seq <= watermark:
+            return []
+
+        cursor.execute(f"SELECT DISTINCT date FROM {table} WHERE change_seq > ? ORDER BY date", (watermark,))
+        dates = [row['date'] for row in cursor.fetchall()]
+
+        for date in dates:
+            cursor.execute(f"SELECT * FROM {table} WHERE date = ? ORDER BY change_seq", (date,))
+            self._write_partition(table, date, cursor.fetchall())
+
+        self._set_watermark(table, max_seq)
+        return dates
+
+    def export(self):
+        results = {}
+        for table in self.TABLES:
+            dates = self.export_table(table)
+            results[table] = dates
+            if dates:
+                print(f"[내보내기] {table}: {len(dates)}개 파티션 ({dates[0]} ~ {dates[-1]})")
+            else:
+                print(f"[내보내기] {table}: 변경된 파티션 없음")
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="detail/daily 테이블을 날짜별 Parquet 파티션으로 증분 내보내기")
+    parser.add_argument("--db", default="youtube_briefing.db", help="SQLite 데이터베이스 경로")
+    parser.add_argument("--out", default="export", help="Parquet 출력 디렉토리")
+    parser.add_argument("--full", action="store_true", help="워터마크를 무시하고 전체 파티션을 다시 쓰기")
+    args = parser.parse_args()
+
+    db = SQLiteManager(args.db)
+    exporter = ParquetExporter(db, args.out)
+    if args.full:
+        exporter.reset_watermarks()
+    exporter.export()
+    db.close()
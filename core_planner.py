@@ -0,0 +1,146 @@
+import os
+
+# YouTube Data API v3 쿼터 비용 (units)
+SEARCH_QUOTA_COST = 100
+LIST_QUOTA_COST = 1
+# 채널 1개 수집 = playlistItems.list + videos.list
+FETCH_QUOTA_COST = 2 * LIST_QUOTA_COST
+
+# 자막 이력이 없는 채널에 가정하는 자막 길이(문자)와 영상 설명 길이
+DEFAULT_TRANSCRIPT_CHARS = 20000
+DEFAULT_DESCRIPTION_CHARS = 500
+# 보관된 자막 크기(UTF-8 bytes)를 문자 수로 환산하는 비율 (한국어 위주 텍스트 기준)
+BYTES_PER_CHAR = 2.5
+# 채널 이력이 없을 때 우선순위 계산에 사용하는 중립 점수
+NEUTRAL_SCORE = 50
+
+
+class RunPlanner:
+    def __init__(self, db, router, archive, youtube_daily_quota=None, blogger_daily_posts=None):
+        """
+        유료/쿼터 API를 호출하기 전에 이번 실행의 비용을 추정하고, 일간 한도에 맞게 작업을 줄이거나 재정렬합니다.
+
+        - YouTube: 채널 ID 검색(100 units)과 채널별 수집(2 units)을 config.csv 행 단위로 계산
+        - Gemini: 채널별 보관 자막 평균 길이와 라우팅 등급으로 입력 토큰을 추정
+        - Blogger: 영상 포스트 수 + 통합 브리핑 1건
+
+        한도는 YOUTUBE_DAILY_QUOTA(기본 10000), GEMINI_DAILY_TOKEN_BUDGET, BLOGGER_DAILY_POSTS(기본 50)
+        환경 변수로 설정하며, 오늘 이미 사용한 양(api_usage 테이블)을 뺀 나머지 안에서 계획합니다.
+        """
+        self.db = db
+        self.router = router
+        self.archive = archive
+
+        if youtube_daily_quota is None:
+            youtube_daily_quota = int(os.getenv('YOUTUBE_DAILY_QUOTA') or 10000)
+        if blogger_daily_posts is None:
+            blogger_daily_posts = int(os.getenv('BLOGGER_DAILY_POSTS') or 50)
+        self.youtube_daily_quota = youtube_daily_quota
+        self.blogger_daily_posts = blogger_daily_posts
+
+    def remaining_youtube_quota(self):
+        return self.youtube_daily_quota - self.db.get_api_usage(['youtube_quota'])
+
+    def remaining_blogger_posts(self):
+        return self.blogger_daily_posts - self.db.get_api_usage(['blogger_posts'])
+
+    def _priority(self, channel):
+        score = self.router.channel_score(channel)
+        return score if score is not None else NEUTRAL_SCORE
+
+    def _estimate_row_tokens(self, row, tier, text_sizes):
+        avg_bytes = text_sizes.get(row.get('Handle'))
+        transcript_chars = int(avg_bytes / BYTES_PER_CHAR) if avg_bytes else DEFAULT_TRANSCRIPT_CHARS
+        # 실제 분석 프롬프트와 같은 방식으로 추정하기 위한 가상의 영상 데이터
+        video = {
+            'category': row.get('Category'),
+            'channel': row.get('Handle'),
+            'title': '',
+            'description': 'x' * DEFAULT_DESCRIPTION_CHARS,
+            'transcript': 'x' * transcript_chars
+        }
+        return self.router.analyzer.estimate_analysis_tokens(video, tier['use_transcript'])
+
+    def plan(self, config_rows):
+        """
+        채널 행을 과거 평균 점수 순으로 정렬한 뒤 한도 안에 들어가는 행만 선택합니다.
+        반환값: {'rows', 'dropped', 'youtube_units', 'gemini_tokens', 'blogger_posts', 'remaining'}
+        """
+        remaining_quota = self.remaining_youtube_quota()
+        remaining_tokens = self.router.remaining_tokens()
+        # 통합 브리핑 포스트 1건은 항상 남겨 둡니다.
+        remaining_posts = self.remaining_blogger_posts() - 1
+        text_sizes = self.archive.get_average_text_size_by_channel()
+
+        ordered = sorted(config_rows, key=lambda row: self._priority(row.get('Handle')), reverse=True)
+
+        plan = {
+            'rows': [], 'dropped': [], 'entries': [],
+            'youtube_units': 0, 'gemini_tokens': 0, 'blogger_posts': 0,
+            'remaining': {
+                'youtube': remaining_quota,
+                'gemini': self.router.remaining_tokens(reserve_briefing=False),
+                'blogger': remaining_posts + 1
+            }
+        }
+
+        for row in ordered:
+            if not (row.get('TargetPlaylistID') or row.get('UploadsID') or row.get('Handle')):
+                continue
+
+            tier = self.router.select_tier(row.get('Handle'))
+            if tier['action'] == 'skip':
+                plan['dropped'].append((row, tier['reason']))
+                continue
+
+            units = FETCH_QUOTA_COST + (0 if row.get('ChannelID') else SEARCH_QUOTA_COST)
+            if plan['youtube_units'] + units > remaining_quota:
+                plan['dropped'].append((row, "YouTube 일간 쿼터 부족"))
+                continue
+
+            tokens = self._estimate_row_tokens(row, tier, text_sizes)
+            if remaining_tokens is not None and plan['gemini_tokens'] + tokens > remaining_tokens:
+                # 예산이 부족하면 저가 모델 + 설명만 분석으로 한 단계 낮춰 봅니다.
+                tier = {'action': 'analyze', 'model': self.router.cheap_model, 'use_transcript': False,
+                        'reason': "일간 토큰 예산 부족 -> 저가 모델, 설명만 분석"}
+                tokens = self._estimate_row_tokens(row, tier, text_sizes)
+                if plan['gemini_tokens'] + tokens > remaining_tokens:
+                    plan['dropped'].append((row, "Gemini 일간 토큰 예산 부족"))
+                    continue
+
+            if plan['blogger_posts'] + 1 > remaining_posts:
+                plan['dropped'].append((row, "Blogger 일간 발행 한도 부족"))
+                continue
+
+            plan['rows'].append(row)
+            plan['entries'].append({'row': row, 'tier': tier, 'youtube_units': units, 'gemini_tokens': tokens})
+            plan['youtube_units'] += units
+            plan['gemini_tokens'] += tokens
+            plan['blogger_posts'] += 1
+
+        if plan['rows']:
+            plan['blogger_posts'] += 1
+            plan['gemini_tokens'] += self.router.briefing_reserve
+        return plan
+
+    def order_videos(self, videos):
+        """수집된 영상을 채널 평균 점수 순으로 정렬하여 예산이 신호가 많은 채널부터 쓰이게 합니다."""
+        return sorted(videos, key=lambda v: self._priority(v.get('channel')), reverse=True)
+
+    def print_plan(self, plan):
+        def fmt_remaining(value):
+            return "무제한" if value is None else f"{value:,}"
+
+        print("\n[실행 계획]")
+        for entry in plan['entries']:
+            row, tier = entry['row'], entry['tier']
+            source = "자막" if tier['use_transcript'] else "설명"
+            print(f"  [포함] {row.get('Handle')} ({row.get('Category')}): {tier['model']}, {source} 분석, "
+                  f"YouTube {entry['youtube_units']} units, Gemini 약 {entry['gemini_tokens']:,} tokens - {tier['reason']}")
+        for row, reason in plan['dropped']:
+            print(f"  [제외] {row.get('Handle')} ({row.get('Category')}): {reason}")
+
+        remaining = plan['remaining']
+        print(f"  YouTube 쿼터: {plan['youtube_units']:,} units (남은 한도 {fmt_remaining(remaining['youtube'])})")
+        print(f"  Gemini 토큰: 약 {plan['gemini_tokens']:,} tokens, 브리핑 예비분 포함 (남은 예산 {fmt_remaining(remaining['gemini'])})")
+        print(f"  Blogger 발행: 최대 {plan['blogger_posts']}건 (남은 한도 {fmt_remaining(remaining['blogger'])})")
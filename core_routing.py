@@ -0,0 +1,149 @@
+import os
+
+
+class ModelRouter:
+    def __init__(self, db, analyzer,
+                 default_model="gemini-2.5-flash",
+                 cheap_model="gemini-2.5-flash-lite",
+                 strong_model="gemini-2.5-pro",
+                 briefing_model="gemini-2.5-pro",
+                 daily_token_budget=None,
+                 briefing_reserve=30000,
+                 window_days=30,
+                 min_history=3,
+                 skip_below=25,
+                 cheap_below=45,
+                 escalate_range=(45, 60)):
+        """
+        채널의 과거 정보 가치 점수(자막 기반 분석 detail.score의 롤링 평균)를 바탕으로 영상별 분석 방식을 결정합니다.
+        설명만 분석한 저가 등급 점수는 이력에서 제외하므로, 강등된 채널은 window_days가 지나 이력이
+        min_history 미만이 되면 다시 기본 모델 + 자막 분석으로 재평가됩니다.
+
+        - 평균 점수가 skip_below 미만인 채널: 분석 생략
+        - 평균 점수가 cheap_below 미만인 채널: 저가 모델 + 영상 설명만 분석
+        - 그 외: 기본 모델 + 전체 자막 분석
+        - 결과 점수가 escalate_range 안에 있으면 상위 모델로 재분석
+
+        모든 결정은 일간 토큰 예산(GEMINI_DAILY_TOKEN_BUDGET, 0 또는 미설정 시 무제한) 안에서 이루어지며,
+        통합 브리핑을 위해 briefing_reserve 만큼의 토큰은 항상 남겨 둡니다.
+        """
+        self.db = db
+        self.analyzer = analyzer
+        self.default_model = default_model
+        self.cheap_model = cheap_model
+        self.strong_model = strong_model
+        self.briefing_model = briefing_model
+
+        if daily_token_budget is None:
+            daily_token_budget = int(os.getenv('GEMINI_DAILY_TOKEN_BUDGET') or 0)
+        self.daily_token_budget = daily_token_budget
+        self.briefing_reserve = briefing_reserve
+        # 같은 API 키로 이 DB 밖에서 오늘 이미 사용한 토큰 (다중 프로필 실행에서 앞선 프로필의 사용량)
+        self.external_tokens_used = 0
+
+        self.window_days = window_days
+        self.min_history = min_history
+        self.skip_below = skip_below
+        self.cheap_below = cheap_below
+        self.escalate_range = escalate_range
+
+    @property
+    def models(self):
+        return sorted({self.default_model, self.cheap_model, self.strong_model, self.briefing_model})
+
+    def tokens_used_today(self):
+        return self.db.get_api_usage(self.models) + self.external_tokens_used
+
+    def remaining_tokens(self, reserve_briefing=True):
+        """남은 일간 토큰 예산을 반환합니다. 예산이 없으면 None(무제한)을 반환합니다."""
+        if not self.daily_token_budget:
+            return None
+        remaining = self.daily_token_budget - self.tokens_used_today()
+        if reserve_briefing:
+            remaining -= self.briefing_reserve
+        return remaining
+
+    def _fits(self, estimate, reserve_briefing=True):
+        remaining = self.remaining_tokens(reserve_briefing)
+        return remaining is None or estimate <= remaining
+
+    def channel_score(self, channel):
+        """
+        최근 window_days일 동안 자막 기반으로 분석한 영상의 채널 평균 점수를 반환합니다.
+        표본이 min_history개 미만이면 판단을 보류하기 위해 None을 반환합니다.
+        """
+        summary = self.db.get_quality_summary('channel', self.window_days, key=channel)
+        if not summary or summary[0]['transcript_count'] < self.min_history:
+            return None
+        return summary[0]['transcript_mean_score']
+
+    def select_tier(self, channel):
+        """
+        예산을 고려하지 않고 채널 이력만으로 분석 등급을 정합니다.
+        반환값: {'action': 'analyze' | 'skip', 'model', 'use_transcript', 'reason'}
+        """
+        score = self.channel_score(channel)
+
+        if score is not None and score < self.skip_below:
+            return {'action': 'skip', 'model': None, 'use_transcript': False,
+                    'reason': f"채널 평균 점수 {score:.0f}점 (저신호 채널)"}
+
+        if score is not None and score < self.cheap_below:
+            return {'action': 'analyze', 'model': self.cheap_model, 'use_transcript': False,
+                    'reason': f"채널 평균 점수 {score:.0f}점 -> 저가 모델, 설명만 분석"}
+
+        return {'action': 'analyze', 'model': self.default_model, 'use_transcript': True,
+                'reason': "이력 부족" if score is None else f"채널 평균 점수 {score:.0f}점"}
+
+    def route(self, video):
+        """
+        영상 1건의 분석 방식을 결정합니다.
+        반환값: {'action': 'analyze' | 'skip', 'model', 'use_transcript', 'estimated_tokens', 'reason'}
+        """
+        tier = self.select_tier(video['channel'])
+        if tier['action'] == 'skip':
+            return {**tier, 'estimated_tokens': 0}
+
+        model, use_transcript, reason = tier['model'], tier['use_transcript'], tier['reason']
+        estimate = self.analyzer.estimate_analysis_tokens(video, use_transcript)
+        if self._fits(estimate):
+            return {'action': 'analyze', 'model': model, 'use_transcript': use_transcript,
+                    'estimated_tokens': estimate, 'reason': reason}
+
+        # 예산이 부족하면 가장 저렴한 방식으로 한 번 더 시도합니다.
+        estimate = self.analyzer.estimate_analysis_tokens(video, use_transcript=False)
+        if self._fits(estimate):
+            return {'action': 'analyze', 'model': self.cheap_model, 'use_transcript': False,
+                    'estimated_tokens': estimate, 'reason': "일간 토큰 예산 부족 -> 저가 모델, 설명만 분석"}
+
+        return {'action': 'skip', 'model': None, 'use_transcript': False, 'estimated_tokens': 0,
+                'reason': "일간 토큰 예산 소진"}
+
+    def briefing_fits(self, estimate):
+        """통합 브리핑 호출이 남은 일간 예산(브리핑 예비분 포함) 안에 들어가는지 확인합니다."""
+        return self._fits(estimate, reserve_briefing=False)
+
+    def should_escalate(self, video, analysis, decision):
+        """
+        경계 구간 점수를 받은 분석 결과를 상위 모델로 재분석할지 판단합니다.
+        기본 모델로 분석한 결과만 대상이며, 예산이 부족하면 재분석하지 않습니다.
+        """
+        if decision['model'] != self.default_model:
+            return False
+
+        score = analysis.get('information_value', {}).get('score')
+        low, high = self.escalate_range
+        if score is None or not (low <= score <= high):
+            return False
+
+        return self._fits(self.analyzer.estimate_analysis_tokens(video, use_transcript=True))
+
+    def escalation_decision(self):
+        return {'action': 'analyze', 'model': self.strong_model, 'use_transcript': True,
+                'estimated_tokens': 0, 'reason': "경계 점수 -> 상위 모델 재분석"}
+
+    def record_usage(self):
+        """분석기의 마지막 호출 사용량을 일간 사용량 테이블에 누적합니다."""
+        usage = self.analyzer.last_usage
+        if usage:
+            self.db.add_api_usage(usage['model'], usage['tokens'])
@@ -0,0 +1,288 @@
+import os
+import re
+import json
+import html
+import hashlib
+import argparse
+from string import Template
+from datetime import datetime
+from core_database import SQLiteManager
+
+# 템플릿이 바뀌면 이 값을 올려 모든 페이지를 다시 렌더링하게 합니다.
+TEMPLATE_VERSION = "1"
+# 목록 페이지(카테고리/일간/첫 페이지)에 표시하는 컬럼. 목록 해시도 이 컬럼만으로 계산합니다.
+LIST_COLUMNS = ('video_id', 'date', 'title', 'channel', 'grade', 'score', 'category', 'thumbnail_url')
+# 첫 페이지에 표시하는 최근 영상 수
+RECENT_LIMIT = 30
+
+# 모듈 로드 시 한 번만 컴파일되는 페이지 템플릿
+PAGE_TEMPLATE = Template('''<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8"/>
+<meta name="viewport" content="width=device-width, initial-scale=1"/>
+<title>$title</title>
+<style>
+body{max-width:860px;margin:0 auto;padding:16px;font-family:sans-serif;line-height:1.6;color:#222;}
+nav a{margin-right:12px;} img{max-width:100%;border-radius:8px;}
+.gallery{display:flex;flex-wrap:wrap;gap:8px;margin-bottom:20px;} .gallery img{width:180px;border-radius:6px;}
+table{border-collapse:collapse;width:100%;} td,th{border-bottom:1px solid #ddd;padding:6px;text-align:left;}
+</style>
+</head>
+<body>
+<nav><a href="${root}index.html">홈</a>$nav</nav>
+<h1>$title</h1>
+$body
+</body>
+</html>
+''')
+
+VIDEO_BODY_TEMPLATE = Template('''<p>$date | $category | $channel</p>
+<div style="text-align:center;margin-bottom:20px;"><img src="$thumbnail_url" alt="thumbnail"/></div>
+<h3>핵심 사실 (Core Facts)</h3><ul>$core_facts</ul>
+<h3>시사점 (Actionable Insights)</h3><ul>$insights</ul>
+<h3>소음 분석 (Noise)</h3><ul>$noise</ul>
+<h3>정보 가치 평가 (Evaluation)</h3>
+<p>$grade ($score/100) | 신호 비율: $signal_ratio</p>
+<p>$reasoning</p>
+<p><a href="$video_url">원본 영상 보기</a></p>
+''')
+
+DAILY_BODY_TEMPLATE = Template('''<div class="gallery">$gallery</div>
+$html_body
+''')
+
+LIST_ROW_TEMPLATE = Template('''<tr><td>$date</td><td><a href="$href">$title</a></td><td>$channel</td><td>$grade ($score)</td></tr>''')
+
+
+def _esc(value):
+    return html.escape(str(value if value is not None else ''))
+
+
+def _parse_json_list(value):
+    if isinstance(value, list):
+        return value
+    try:
+        parsed = json.loads(value or '[]')
+    except (json.JSONDecodeError, TypeError):
+        return [value] if value else []
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+def _slugify(text):
+    slug = re.sub(r'[^\w]+', '-', (text or '미분류').strip().lower()).strip('-')
+    return slug or 'uncategorized'
+
+
+class StaticSiteRenderer:
+    def __init__(self, db, out_dir="site"):
+        """
+        SQLite의 detail/daily 테이블로부터 로컬 정적 아카이브를 생성합니다.
+        (영상별 페이지, 일간 브리핑 페이지, 카테고리 색인, 첫 페이지)
+
+        detail/daily 테이블의 change_seq로 지난 빌드 이후 바뀐 행만 읽어, 그 행의 페이지와
+        행이 나타나는 카테고리/일간 브리핑/첫 페이지만 다시 만듭니다. (빌드 비용이 아카이브 전체가 아닌 변경분에 비례)
+        페이지마다 원본 행과 템플릿 버전으로 계산한 해시를 site_page 테이블에 기록하여,
+        대상 페이지 중에서도 해시가 바뀌었거나 파일이 없는 페이지만 실제로 씁니다.
+        """
+        self.db = db
+        self.out_dir = out_dir
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.db.conn:
+            self.db.conn.execute('''
+                CREATE TABLE IF NOT EXISTS site_page (
+                    path TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    rendered_at TEXT NOT NULL
+                )
+            ''')
+            # 카테고리 페이지와 첫 페이지의 최근 영상 목록 조회용 인덱스
+            self.db.conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_category_date ON detail (category, date)")
+            self.db.conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_date_video ON detail (date DESC, video_id)")
+
+    def _source_hash(self, source):
+        payload = TEMPLATE_VERSION + json.dumps(source, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _write_if_changed(self, path, source, render):
+        """원본 해시가 바뀐 페이지만 렌더링합니다. 렌더링했으면 True를 반환합니다."""
+        content_hash = self._source_hash(source)
+        full_path = os.path.join(self.out_dir, path)
+
+        row = self.db.conn.execute("SELECT content_hash FROM site_page WHERE path = ?", (path,)).fetchone()
+        if row and row['content_hash'] == content_hash and os.path.exists(full_path):
+            return False
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        temp_path = full_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(render())
+        os.replace(temp_path, full_path)
+
+        with self.db.conn:
+            self.db.conn.execute(
+                "INSERT OR REPLACE INTO site_page (path, content_hash, rendered_at) VALUES (?, ?, ?)",
+                (path, content_hash, datetime.now().isoformat(timespec='seconds'))
+            )
+        return True
+
+    def _page(self, title, body, root, categories):
+        nav = ''.join(
+            f'<a href="{root}category/{_slugify(c)}.html">{_esc(c)}</a>' for c in categories
+        )
+        return PAGE_TEMPLATE.substitute(title=_esc(title), body=body, root=root, nav=nav)
+
+    def _render_video(self, row, categories):
+        noise = []
+        for item in _parse_json_list(row['noise_analysis']):
+            if isinstance(item, dict):
+                noise.append(f"<li>[{_esc(item.get('label'))}] {_esc(item.get('quote'))}</li>")
+            else:
+                noise.append(f"<li>{_esc(item)}</li>")
+
+        body = VIDEO_BODY_TEMPLATE.substitute(
+            date=_esc(row['date']),
+            category=_esc(row['category']),
+            channel=_esc(row['channel']),
+            thumbnail_url=_esc(row['thumbnail_url']),
+            core_facts=''.join(f'<li>{_esc(f)}</li>' for f in _parse_json_list(row['core_fact'])),
+            insights=''.join(f'<li>{_esc(i)}</li>' for i in _parse_json_list(row['actionable_insight'])),
+            noise=''.join(noise),
+            grade=_esc(row['grade']),
+            score=_esc(row['score']),
+            signal_ratio=_esc(row['signal_ratio']),
+            reasoning=_esc(row['reasoning']),
+            video_url=_esc(row['video_url'])
+        )
+        return self._page(row['title'], body, '../', categories)
+
+    def _render_daily(self, daily, videos, categories):
+        gallery = ''.join(
+            f'<a href="../videos/{_esc(v["video_id"])}.html"><img src="{_esc(v["thumbnail_url"])}" alt="{_esc(v["title"])}"/></a>'
+            for v in videos
+        )
+        # html_body는 Blogger 게시용으로 생성된 HTML이므로 그대로 삽입합니다.
+        body = DAILY_BODY_TEMPLATE.substitute(gallery=gallery, html_body=daily['html_body'] or '')
+        return self._page(f"{daily['date']} 일간 미디어 브리핑", body, '../', categories)
+
+    def _render_list(self, title, videos, root, categories, intro=''):
+        rows = ''.join(
+            LIST_ROW_TEMPLATE.substitute(
+                date=_esc(v['date']),
+                href=f"{root}videos/{_esc(v['video_id'])}.html",
+                title=_esc(v['title']),
+                channel=_esc(v['channel']),
+                grade=_esc(v['grade']),
+                score=_esc(v['score'])
+            )
+            for v in videos
+        )
+        body = intro + f'<table><tr><th>날짜</th><th>제목</th><th>채널</th><th>평가</th></tr>{rows}</table>'
+        return self._page(title, body, root, categories)
+
+    def _summaries(self, where='', params=(), limit=None):
+        query = f"SELECT {', '.join(LIST_COLUMNS)} FROM detail {where} ORDER BY date DESC, video_id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.db.conn.execute(query, params).fetchall()]
+
+    def _category_summaries(self, category):
+        # 카테고리가 비어 있는 영상은 '미분류'로 표시합니다.
+        where = "WHERE category = ? OR category IS NULL" if category == '미분류' else "WHERE category = ?"
+        return self._summaries(where, (category,))
+
+    def build(self, full=False):
+        """
+        변경된 페이지만 다시 렌더링하고, 렌더링한 페이지 수를 반환합니다.
+        full=True이거나 템플릿 버전 또는 카테고리 목록(모든 페이지의 내비게이션)이 바뀌면 전체 페이지를 다시 확인합니다.
+        지워진 파일을 되살릴 때도 full=True로 실행합니다.
+        """
+        cursor = self.db.conn.cursor()
+        stored_categories = self.db.get_state('site_categories')
+        full = full or stored_categories is None or self.db.get_state('site_template_version') != TEMPLATE_VERSION
+
+        if not full:
+            detail_seq = int(self.db.get_state('site_detail_seq', 0))
+            daily_seq = int(self.db.get_state('site_daily_seq', 0))
+            details = [dict(row) for row in cursor.execute(
+                "SELECT * FROM detail WHERE change_seq > ? ORDER BY change_seq", (detail_seq,)
+            ).fetchall()]
+            dailies = [dict(row) for row in cursor.execute(
+                "SELECT * FROM daily WHERE change_seq > ? ORDER BY change_seq", (daily_seq,)
+            ).fetchall()]
+            stored_categories = json.loads(stored_categories)
+            categories = sorted(set(stored_categories) | {d['category'] or '미분류' for d in details})
+            # 새 카테고리가 생기면 모든 페이지의 내비게이션이 바뀝니다.
+            full = categories != stored_categories
+
+        if full:
+            details = [dict(row) for row in cursor.execute("SELECT * FROM detail ORDER BY change_seq").fetchall()]
+            dailies = [dict(row) for row in cursor.execute("SELECT * FROM daily ORDER BY change_seq").fetchall()]
+            categories = sorted({d['category'] or '미분류' for d in details})
+
+        rendered = 0
+        for row in details:
+            rendered += self._write_if_changed(
+                f"videos/{row['video_id']}.html", [row, categories],
+                lambda row=row: self._render_video(row, categories)
+            )
+
+        # 바뀐 브리핑과, 영상이 추가된 날짜의 브리핑 갤러리를 다시 만듭니다.
+        affected_dailies = {d['date']: d for d in dailies}
+        for date in {d['date'] for d in details} - set(affected_dailies):
+            daily = cursor.execute("SELECT * FROM daily WHERE date = ?", (date,)).fetchone()
+            if daily:
+                affected_dailies[date] = dict(daily)
+        for date, daily in sorted(affected_dailies.items()):
+            videos = self._summaries("WHERE date = ?", (date,))
+            rendered += self._write_if_changed(
+                f"daily/{date}.html", [daily, videos, categories],
+                lambda daily=daily, videos=videos: self._render_daily(daily, videos, categories)
+            )
+
+        affected_categories = categories if full else sorted({d['category'] or '미분류' for d in details})
+        for category in affected_categories:
+            videos = self._category_summaries(category)
+            rendered += self._write_if_changed(
+                f"category/{_slugify(category)}.html", [category, videos, categories],
+                lambda category=category, videos=videos: self._render_list(category, videos, '../', categories)
+            )
+
+        if full or details or dailies:
+            dates = [row['date'] for row in cursor.execute("SELECT date FROM daily ORDER BY date DESC").fetchall()]
+            recent = self._summaries(limit=RECENT_LIMIT)
+            rendered += self._write_if_changed(
+                "index.html", [dates, recent, categories],
+                lambda: self._render_list(
+                    "Youtube Briefing 아카이브", recent, '', categories,
+                    intro='<h3>일간 브리핑</h3><ul>' + ''.join(
+                        f'<li><a href="daily/{_esc(d)}.html">{_esc(d)}</a></li>' for d in dates
+                    ) + '</ul><h3>최근 분석 영상</h3>'
+                )
+            )
+
+        # 렌더링이 모두 끝난 뒤에 기준점을 옮겨, 중간에 실패하면 다음 빌드에서 다시 처리합니다.
+        if details:
+            self.db.set_state('site_detail_seq', max(d['change_seq'] for d in details))
+        if dailies:
+            self.db.set_state('site_daily_seq', max(d['change_seq'] for d in dailies))
+        if full:
+            self.db.set_state('site_categories', json.dumps(categories, ensure_ascii=False))
+            self.db.set_state('site_template_version', TEMPLATE_VERSION)
+
+        print(f"[정적 아카이브] {rendered}개 페이지 렌더링 ({os.path.abspath(self.out_dir)})")
+        return rendered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite 분석 결과로 로컬 정적 아카이브를 증분 생성")
+    parser.add_argument("--db", default="youtube_briefing.db", help="SQLite 데이터베이스 경로")
+    parser.add_argument("--out", default="site", help="정적 사이트 출력 디렉토리")
+    parser.add_argument("--full", action="store_true", help="변경분이 아닌 전체 페이지를 다시 확인 (지워진 파일 복구 등)")
+    args = parser.parse_args()
+
+    db = SQLiteManager(args.db)
+    StaticSiteRenderer(db, args.out).build(full=args.full)
+    db.close()
@@ -0,0 +1,220 @@
+import time
+import heapq
+import signal
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from main_orchestrator import PipelineOrchestrator
+from core_planner import FETCH_QUOTA_COST
+
+# 마지막 통합 브리핑에 포함된 detail.change_seq (pipeline_state 키)
+BRIEFING_WATERMARK_KEY = 'daemon_briefing_seq'
+
+class PipelineDaemon:
+    def __init__(self, config_path="config.csv", briefing_time="21:00",
+                 most_viewed_lead_minutes=60, min_poll_minutes=10, max_poll_minutes=180):
+        """
+        크론 대신 상시 구동되는 데몬입니다.
+        YouTube/Gemini/Blogger 클라이언트와 DB 연결을 한 번만 만들어 유지하고,
+        채널마다 자신의 업로드 주기에 맞춰 폴링하여 새 영상을 업로드 직후 분석/발행합니다.
+
+        - 폴링 주기: config.csv의 PollMinutes 값이 있으면 사용하고,
+          없으면 최근 업로드 간격의 중앙값으로부터 추정합니다. (하루 한 번 재계산)
+        - 'most viewed' 채널은 조회수가 쌓인 뒤에 판단해야 하므로 브리핑 직전에 하루 한 번만 수집합니다.
+        - 통합 브리핑은 매일 briefing_time에 지난 브리핑 이후 DB에 저장된 분석 결과로 생성합니다.
+          (브리핑 시각 이후 자정까지 분석된 영상은 다음 날 브리핑에 포함됩니다)
+        - 브리핑 시각이 지난 뒤 시작했는데 오늘 브리핑이 없으면 첫 폴링 직후 따라잡기 브리핑을 만듭니다.
+        - 하루를 시작할 때 실행 계획(RunPlanner)으로 한도 안에 들어가는 채널만 일정에 올리고,
+          남은 YouTube 쿼터가 수집 1회 비용보다 적어지면 그날의 폴링을 중단합니다.
+        """
+        self.pipeline = PipelineOrchestrator(config_path)
+        self.briefing_time = datetime.strptime(briefing_time, "%H:%M").time()
+        self.most_viewed_lead = timedelta(minutes=most_viewed_lead_minutes)
+        self.min_poll_minutes = min_poll_minutes
+        self.max_poll_minutes = max_poll_minutes
+
+        self.running = False
+        self.current_date = None
+        self._queue = []
+        self._seq = 0
+        # 크론 실행과 동일하게 채널당 하루 1개 영상만 처리합니다.
+        self._done_today = set()
+        # 지난 브리핑 이후 Blogger에 실제로 발행된 카테고리 (브리핑 라벨용)
+        self._published_categories = set()
+
+    def _schedule(self, when, job, row=None):
+        self._seq += 1
+        heapq.heappush(self._queue, (when, self._seq, job, row))
+
+    def _today_at(self, t):
+        return datetime.combine(datetime.now().date(), t)
+
+    def _has_fetch_quota(self):
+        return self.pipeline.planner.remaining_youtube_quota() >= FETCH_QUOTA_COST
+
+    def _learn_poll_minutes(self, row):
+        """채널의 최근 업로드 간격 중앙값의 1/6을 폴링 주기로 사용합니다."""
+        configured = (row.get('PollMinutes') or '').strip()
+        if configured:
+            try:
+                return max(self.min_poll_minutes, int(round(float(configured))))
+            except (ValueError, OverflowError):
+                print(f"[설정 경고] {row.get('Handle')}: PollMinutes 값 '{configured}'을(를) 해석할 수 없어 업로드 주기로 추정합니다.")
+
+        # 주기 추정에 쿼터를 쓰면 그날 수집할 쿼터가 모자라는 경우 가장 긴 주기를 사용합니다.
+        if not self._has_fetch_quota():
+            return self.max_poll_minutes
+
+        playlist_id = row.get('TargetPlaylistID') or row.get('UploadsID')
+        try:
+            times = self.pipeline.track_youtube_quota(self.pipeline.youtube.get_recent_upload_times, playlist_id)
+        except Exception as e:
+            print(f"[주기 추정 실패] {row.get('Handle')}: {str(e)}")
+            times = []
+
+        if len(times) < 2:
+            return self.max_poll_minutes
+
+        gaps = [(a - b).total_seconds() / 60 for a, b in zip(times, times[1:])]
+        minutes = statistics.median(gaps) / 6
+        return int(min(self.max_poll_minutes, max(self.min_poll_minutes, minutes)))
+
+    def _start_day(self):
+        """날짜가 바뀌면 설정을 다시 읽고 하루치 일정을 새로 만듭니다."""
+        self.current_date = datetime.now().date()
+        self._queue = []
+        self._done_today = set()
+        self.pipeline.dedup.reset()
+
+        if not self.pipeline.load_config():
+            return
+
+        # 크론 실행과 같은 실행 계획으로 일간 한도 안에 들어가는 채널만 일정에 올립니다.
+        plan = self.pipeline.planner.plan(self.pipeline.config_data)
+        self.pipeline.planner.print_plan(plan)
+        self.pipeline.fill_missing_ids(plan['rows'])
+
+        now = datetime.now()
+        briefing_at = self._today_at(self.briefing_time)
+
+        print(f"\n[데몬] {self.current_date} 일정 구성")
+        for row in plan['rows']:
+            if 'most viewed' in row.get('FilterCriteria', '').lower():
+                self._schedule(max(now, briefing_at - self.most_viewed_lead), 'poll', row)
+                print(f"  [일정] {row.get('Handle')}: 브리핑 {self.most_viewed_lead.seconds // 60}분 전 1회 (most viewed)")
+            else:
+                row['_poll_minutes'] = self._learn_poll_minutes(row)
+                self._schedule(now, 'poll', row)
+                print(f"  [일정] {row.get('Handle')}: {row['_poll_minutes']}분 간격")
+
+        if briefing_at > now:
+            self._schedule(briefing_at, 'briefing')
+        elif not self.pipeline.db.has_daily_briefing():
+            # 같은 시각에 먼저 등록된 폴링들이 끝난 뒤 실행됩니다.
+            self._schedule(now, 'briefing')
+            print("  [일정] 브리핑 시각이 지나 첫 폴링 후 따라잡기 브리핑을 생성합니다.")
+        self._schedule(datetime.combine(self.current_date + timedelta(days=1), datetime.min.time()), 'rollover')
+
+    def _poll_channel(self, row):
+        handle = row.get('Handle')
+        if handle in self._done_today:
+            return
+        if not self._has_fetch_quota():
+            print(f"[데몬] YouTube 일간 쿼터 부족으로 {handle} 폴링을 오늘은 중단합니다.")
+            return
+
+        new_videos = self.pipeline.collect_new_videos([row])
+        if new_videos:
+            print(f"\n[데몬] {handle} 새 영상 감지: {len(new_videos)}개")
+            representatives = self.pipeline.prepare_videos(new_videos)
+            analyzed_results = self.pipeline.analyze_videos(representatives)
+            # 분석 결과가 저장되었거나 이미 저장된 대표 영상에 중복으로 연결된 경우에만 오늘 처리를 끝냅니다.
+            if analyzed_results or not representatives:
+                self.pipeline.render_site()
+                self._published_categories |= self.pipeline.publish_videos(analyzed_results)
+                self._done_today.add(handle)
+                return
+
+            # 분석이 실패하면(Gemini 오류 등) 24시간 창을 벗어나기 전에 다시 시도합니다.
+            retry_minutes = row.get('_poll_minutes') or self.min_poll_minutes
+            print(f"[데몬] {handle} 분석 결과가 저장되지 않아 {retry_minutes}분 후 다시 시도합니다.")
+            self._schedule(datetime.now() + timedelta(minutes=retry_minutes), 'poll', row)
+            return
+
+        if row.get('_poll_minutes'):
+            self._schedule(datetime.now() + timedelta(minutes=row['_poll_minutes']), 'poll', row)
+
+    def _pending_briefing_analyses(self):
+        """지난 브리핑 이후 저장된 분석 결과를 반환합니다."""
+        last_seq = self.pipeline.db.get_state(BRIEFING_WATERMARK_KEY)
+        if last_seq is None:
+            # 데몬을 처음 띄운 DB라면 과거 전체가 아니라 오늘 분석된 영상부터 브리핑합니다.
+            return self.pipeline.db.get_detail_by_date()
+        return self.pipeline.db.get_detail_since(int(last_seq))
+
+    def _run_briefing(self):
+        analyzed_results = self._pending_briefing_analyses()
+        if not analyzed_results:
+            print("\n[데몬] 지난 브리핑 이후 분석된 영상이 없어 통합 브리핑을 생략합니다.")
+            return
+
+        print(f"\n[데몬] 통합 브리핑 생성 ({len(analyzed_results)}개 영상)")
+        briefing_data = self.pipeline.create_briefing(analyzed_results)
+        self.pipeline.render_site()
+        if briefing_data:
+            # 브리핑이 저장된 경우에만 기준점을 옮겨, 실패한 분석분은 다음 브리핑에 다시 포함합니다.
+            self.pipeline.db.set_state(BRIEFING_WATERMARK_KEY, max(a['change_seq'] for a in analyzed_results))
+            # 크론 실행과 같이 발행 한도로 생략된 포스트의 카테고리는 라벨에서 제외합니다.
+            categories, self._published_categories = self._published_categories, set()
+            self.pipeline.publish_briefing(briefing_data, analyzed_results, categories)
+
+    def stop(self, signum=None, frame=None):
+        print("\n[데몬] 종료 신호 수신, 현재 작업 후 종료합니다.")
+        self.running = False
+
+    def run(self):
+        print("[Youtube Briefing Local] 데몬 모드 가동")
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.running = True
+        self._start_day()
+
+        while self.running:
+            if not self._queue:
+                # 설정 로드 실패 등으로 일정이 비었으면 잠시 후 다시 시도합니다.
+                time.sleep(60)
+                self._start_day()
+                continue
+
+            when, _, job, row = self._queue[0]
+            wait = (when - datetime.now()).total_seconds()
+            if wait > 0:
+                # 종료 신호에 빠르게 반응하도록 짧게 나누어 대기합니다.
+                time.sleep(min(wait, 30))
+                continue
+
+            heapq.heappop(self._queue)
+            try:
+                if job == 'poll':
+                    self._poll_channel(row)
+                elif job == 'briefing':
+                    self._run_briefing()
+                elif job == 'rollover':
+                    self._start_day()
+            except Exception as e:
+                print(f"[데몬 작업 오류] {job} {row.get('Handle') if row else ''}: {str(e)}")
+                if job == 'poll' and row.get('_poll_minutes'):
+                    self._schedule(datetime.now() + timedelta(minutes=row['_poll_minutes']), 'poll', row)
+
+        self.pipeline.shutdown()
+        print("[Youtube Briefing Local] 데몬 정상 종료")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채널별 주기로 새 영상을 감시하는 상시 구동 모드")
+    parser.add_argument("--config", default="config.csv", help="채널 설정 CSV 경로")
+    parser.add_argument("--briefing-time", default="21:00", help="일간 통합 브리핑 생성 시각 (HH:MM)")
+    args = parser.parse_args()
+
+    daemon = PipelineDaemon(args.config, args.briefing_time)
+    daemon.run()
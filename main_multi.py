@@ -0,0 +1,112 @@
+import csv
+import os
+import argparse
+from dotenv import load_dotenv
+from api_youtube import YouTubeAgent
+from api_gemini import GeminiAnalyzer
+from api_blogger import BloggerPublisher
+from main_orchestrator import PipelineOrchestrator
+
+load_dotenv()
+
+class MultiProfileRunner:
+    def __init__(self, profiles_path="profiles.csv"):
+        """
+        여러 프로필(각자의 config.csv, Blogger 블로그, 카테고리 구성)을 한 프로세스에서 순서대로 실행합니다.
+
+        YouTube/Gemini/Blogger 클라이언트(HTTP 연결, discovery 문서, 인증 정보, Gemini 컨텍스트 캐시)는 한 번만 만들어 공유하고,
+        여러 프로필에 겹치는 채널은 채널 검색/영상 수집/자막 추출/분석을 한 번만 수행합니다.
+        분석 결과와 사용량 기록은 프로필별 SQLite DB와 정적 아카이브 디렉토리에 따로 저장합니다.
+
+        profiles.csv 컬럼: Profile, ConfigPath, BlogID, DBPath, SiteDir
+        (BlogID가 비어 있으면 .env의 BLOG_ID, DBPath/SiteDir가 비어 있으면 프로필 이름으로 경로를 만듭니다)
+        """
+        self.profiles_path = profiles_path
+        self.profiles = []
+
+    def load_profiles(self):
+        if not os.path.exists(self.profiles_path):
+            print(f"[오류] 프로필 파일이 없습니다: {self.profiles_path}")
+            return False
+
+        try:
+            with open(self.profiles_path, mode='r', encoding='utf-8-sig') as file:
+                rows = list(csv.DictReader(file))
+        except Exception as e:
+            print(f"[오류] 프로필 로드 중 예외 발생: {str(e)}")
+            return False
+
+        self.profiles = []
+        for row in rows:
+            name = (row.get('Profile') or '').strip()
+            config_path = (row.get('ConfigPath') or '').strip()
+            if not name or not config_path:
+                continue
+            self.profiles.append({
+                'name': name,
+                'config_path': config_path,
+                'blog_id': (row.get('BlogID') or '').strip() or None,
+                'db_path': (row.get('DBPath') or '').strip() or f"youtube_briefing_{name}.db",
+                'site_dir': (row.get('SiteDir') or '').strip() or os.path.join("site", name)
+            })
+
+        db_paths = [p['db_path'] for p in self.profiles]
+        if len(set(db_paths)) != len(db_paths):
+            print("[오류] 프로필마다 서로 다른 DBPath가 필요합니다.")
+            return False
+
+        print(f"[완료] 프로필 {len(self.profiles)}개 확인")
+        return bool(self.profiles)
+
+    def run(self, dry_run=False):
+        print("[Youtube Briefing Local] 다중 프로필 실행" + (" (dry-run)" if dry_run else ""))
+        if not self.load_profiles():
+            return
+
+        youtube = YouTubeAgent()
+        youtube.enable_shared_cache()
+        gemini = GeminiAnalyzer()
+        gemini.enable_result_cache()
+        # token.json 인증과 discovery 문서 로드는 한 번만 수행합니다.
+        blogger_service = BloggerPublisher().service
+
+        try:
+            for profile in self.profiles:
+                print(f"\n========== [프로필] {profile['name']} ({profile['config_path']}) ==========")
+                quota_before = youtube.quota_used
+                tokens_before = gemini.tokens_used
+                pipeline = None
+                try:
+                    pipeline = PipelineOrchestrator(
+                        profile['config_path'],
+                        db_path=profile['db_path'],
+                        site_dir=profile['site_dir'],
+                        youtube=youtube,
+                        gemini=gemini,
+                        blogger=BloggerPublisher(profile['blog_id'], service=blogger_service)
+                    )
+                    # YouTube 쿼터는 API 키 단위로 공유되므로 앞선 프로필이 이 프로세스에서 쓴 양을 한도에서 뺍니다.
+                    pipeline.planner.youtube_daily_quota -= quota_before
+                    # Gemini 토큰 예산도 키 단위이므로 앞선 프로필이 쓴 토큰을 이 프로필의 사용량에 더합니다.
+                    pipeline.router.external_tokens_used = tokens_before
+                    pipeline.run(dry_run=dry_run)
+                except Exception as e:
+                    print(f"[프로필 실행 오류] {profile['name']}: {str(e)}")
+                finally:
+                    # run()이 중간에 예외로 끝나도 DB 연결과 중복 탐지 프로세스 풀을 정리합니다.
+                    if pipeline is not None:
+                        pipeline.shutdown()
+        finally:
+            gemini.close()
+
+        print(f"\n[Youtube Briefing Local] 다중 프로필 실행 종료 "
+              f"(YouTube 쿼터 {youtube.quota_used} units, Gemini 약 {gemini.tokens_used:,} tokens 사용)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 프로필을 클라이언트와 캐시를 공유하며 한 프로세스에서 실행")
+    parser.add_argument("--profiles", default="profiles.csv", help="프로필 목록 CSV 경로")
+    parser.add_argument("--dry-run", action="store_true", help="API 호출 없이 프로필별 실행 계획만 출력")
+    args = parser.parse_args()
+
+    runner = MultiProfileRunner(args.profiles)
+    runner.run(dry_run=args.dry_run)
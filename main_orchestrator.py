@@ -1,26 +1,45 @@
 import csv
 import os
-import time
+import argparse
 from datetime import datetime
 from dotenv import load_dotenv
 from core_database import SQLiteManager
 from api_youtube import YouTubeAgent
 from api_gemini import GeminiAnalyzer
 from api_blogger import BloggerPublisher
+from core_dedup import NearDuplicateDetector
+from core_archive import TranscriptArchive
+from core_routing import ModelRouter
+from core_planner import RunPlanner
+from core_site import StaticSiteRenderer
 
 load_dotenv()
 
 class PipelineOrchestrator:
-    def __init__(self, config_path="config.csv"):
+    def __init__(self, config_path="config.csv", db_path="youtube_briefing.db", site_dir="site",
+                 youtube=None, gemini=None, blogger=None):
+        # youtube/gemini/blogger를 넘기면 다중 프로필 실행처럼 다른 파이프라인과 클라이언트를 공유합니다.
+        # 공유받은 Gemini 클라이언트의 컨텍스트 캐시는 소유자가 정리하므로 shutdown에서 닫지 않습니다.
         self.config_path = config_path
-        self.db = SQLiteManager()
-        self.youtube = YouTubeAgent()
-        self.gemini = GeminiAnalyzer()
-        self.blogger = BloggerPublisher()
+        self.db = SQLiteManager(db_path)
+        self.youtube = youtube or YouTubeAgent()
+        self._owns_gemini = gemini is None
+        self.gemini = gemini or GeminiAnalyzer()
+        self.blogger = blogger or BloggerPublisher()
+        self.dedup = NearDuplicateDetector()
+        self.archive = TranscriptArchive(self.db.conn)
         self.config_data = []
+        self._closed = False
         
         self.analysis_model = "gemini-2.5-flash"
         self.briefing_model = "gemini-2.5-pro"
+        self.router = ModelRouter(
+            self.db, self.gemini,
+            default_model=self.analysis_model,
+            briefing_model=self.briefing_model
+        )
+        self.planner = RunPlanner(self.db, self.router, self.archive)
+        self.site = StaticSiteRenderer(self.db, site_dir)
 
     def load_config(self):
         print("[1단계] 설정 파일 로드 시작")
@@ -40,91 +59,258 @@ class PipelineOrchestrator:
 
     def save_config(self):
         try:
-            fieldnames = ['Category', 'Handle', 'FilterCriteria', 'TargetPlaylistID', 'ChannelID', 'UploadsID']
+            fieldnames = ['Category', 'Handle', 'FilterCriteria', 'TargetPlaylistID', 'ChannelID', 'UploadsID', 'PollMinutes']
             with open(self.config_path, mode='w', encoding='utf-8-sig', newline='') as file:
-                writer = csv.DictWriter(file, fieldnames=fieldnames)
+                writer = csv.DictWriter(file, fieldnames=fieldnames, restval='', extrasaction='ignore')
                 writer.writeheader()
                 writer.writerows(self.config_data)
             print("[완료] 업데이트된 설정 데이터를 CSV 파일에 저장했습니다.")
         except Exception as e:
             print(f"[오류] CSV 저장 중 예외 발생: {str(e)}")
 
-    def run(self):
-        print("[Youtube Briefing Local] 파이프라인 가동")
-
-        if not self.load_config():
-            self.db.close()
+    def shutdown(self):
+        # run()의 종료 경로와 다중 프로필 실행기의 finally에서 모두 호출되므로 한 번만 정리합니다.
+        if self._closed:
             return
+        self._closed = True
+        self.dedup.close()
+        if self._owns_gemini:
+            self.gemini.close()
+        self.db.close()
 
-        config_updated = self.youtube.fill_missing_ids(self.config_data)
-        if config_updated:
+    def track_youtube_quota(self, func, *args):
+        # 호출 동안 소모한 YouTube 쿼터를 일간 사용량에 기록합니다.
+        before = self.youtube.quota_used
+        try:
+            return func(*args)
+        finally:
+            if self.youtube.quota_used > before:
+                self.db.add_api_usage('youtube_quota', self.youtube.quota_used - before)
+
+    def fill_missing_ids(self, config_rows):
+        if self.track_youtube_quota(self.youtube.fill_missing_ids, config_rows):
             self.save_config()
 
-        print("\n[2단계] 유튜브 데이터 수집 시작")
-        all_videos = self.youtube.fetch_videos(self.config_data)
-        
+    def collect_new_videos(self, config_rows):
+        """[2~3단계] 채널별 영상을 수집하고 이미 처리된 영상을 제외합니다."""
+        all_videos = self.track_youtube_quota(self.youtube.fetch_videos, config_rows)
         if not all_videos:
-            print("[종료] 24시간 이내에 발행된 새로운 영상이 없습니다.")
-            self.db.close()
+            return []
+
+        processed_ids = set(self.db.get_processed_video_ids())
+        return [v for v in all_videos if v['videoId'] not in processed_ids]
+
+    def prepare_videos(self, videos):
+        """[4단계] 자막을 확보하고 채널 간 중복 스토리를 묶어 대표 영상만 반환합니다."""
+        for video in videos:
+            # 이전에 보관한 자막이 있으면 다시 내려받지 않습니다. (재분석 시)
+            transcript = self.archive.get_text(video['videoId'])
+            if transcript is None:
+                print(f"[자막 요청] {video['title']}")
+                transcript, raw_transcript = self.youtube.extract_transcript(video['videoId'], include_raw=True)
+                self.archive.store(video['videoId'], transcript, raw_transcript)
+            else:
+                print(f"[자막 보관본 사용] {video['title']}")
+            video['transcript'] = transcript
+            # 다음 자막을 내려받는 동안 프로세스 풀에서 시그니처를 계산합니다.
+            self.dedup.submit(video)
+
+        stats = self.archive.get_stats()
+        if stats['raw_size']:
+            print(f"[자막 보관] {stats['videos']}개 영상, {stats['raw_size'] / 1048576:.1f}MB -> "
+                  f"{stats['compressed_size'] / 1048576:.1f}MB (압축률 {stats['ratio']:.1%})")
+
+        print("\n[4-1단계] 채널 간 중복 스토리 클러스터링")
+        representatives, duplicates = self.dedup.cluster()
+        rep_by_id = {v['videoId']: v for v in representatives}
+        for video, representative_id, similarity in duplicates:
+            representative = rep_by_id.get(representative_id)
+            if representative:
+                # 중복 연결은 대표 영상의 분석이 저장된 뒤에 기록합니다. (analyze_videos 참고)
+                representative.setdefault('cluster_members', []).append((video, similarity))
+                representative.setdefault('related_channels', []).append(video['channel'])
+                print(f"[중복 후보] {video['title']} -> {representative_id} (유사도 {similarity:.2f})")
+            else:
+                # 이전 호출에서 저장까지 끝난 대표 영상과 묶인 경우 바로 연결합니다.
+                self.db.save_duplicate_link(video, representative_id, similarity)
+                print(f"[중복 연결] {video['title']} -> {representative_id} (유사도 {similarity:.2f})")
+        print(f"[완료] 대표 영상 {len(representatives)}개, 중복 영상 {len(duplicates)}개")
+        return representatives
+
+    def analyze_videos(self, videos):
+        """
+        [5단계] 라우팅 정책에 따라 영상을 분석하고 결과를 DB에 저장합니다.
+        대표 영상이 저장되면 같은 클러스터의 중복 영상을 연결하고, 분석이 실패하거나 생략되면
+        다음 클러스터 구성원을 대표로 승격하여 다시 시도합니다.
+        """
+        analyzed_results = []
+        # 예산이 신호가 많은 채널부터 쓰이도록 채널 평균 점수 순으로 분석합니다.
+        for video in self.planner.order_videos(videos):
+            members = [(video, 1.0)] + video.pop('cluster_members', [])
+            saved, saved_similarity = None, 1.0
+            for index, (candidate, similarity) in enumerate(members):
+                if index:
+                    print(f"[대표 승격] {candidate['title']} (이전 대표 분석 실패/생략)")
+                    candidate['related_channels'] = [m['channel'] for m, _ in members if m is not candidate]
+                result = self._analyze_video(candidate)
+                if result:
+                    analyzed_results.append(result)
+                    saved, saved_similarity = candidate, similarity
+                    break
+
+            if saved is None:
+                # 클러스터 전체가 저장되지 않았으므로 다음 실행에서 다시 수집/분석되도록 남겨 둡니다.
+                self.dedup.discard(video['videoId'])
+                continue
+            if saved is not video:
+                self.dedup.promote(video['videoId'], saved['videoId'])
+
+            for member, similarity in members:
+                if member is saved:
+                    continue
+                # 원래 대표와 새 대표의 유사도는 새 대표가 원래 대표와 비교된 값으로 기록합니다.
+                link_similarity = saved_similarity if member is video else similarity
+                self.db.save_duplicate_link(member, saved['videoId'], link_similarity)
+                print(f"[중복 연결] {member['title']} -> {saved['videoId']} (유사도 {link_similarity:.2f})")
+        return analyzed_results
+
+    def _analyze_video(self, video):
+        """영상 1개를 분석하여 저장하고 결과를 반환합니다. 생략/실패하면 None을 반환합니다."""
+        decision = self.router.route(video)
+        if decision['action'] == 'skip':
+            print(f"[분석 생략] {video['title']}: {decision['reason']}")
+            return None
+
+        print(f"[분석 요청] {video['title']} ({decision['model']}, {decision['reason']})")
+        analysis = self.gemini.analyze_video(video, decision['model'], decision['use_transcript'])
+        self.router.record_usage()
+        use_transcript = decision['use_transcript']
+
+        if analysis and self.router.should_escalate(video, analysis, decision):
+            escalation = self.router.escalation_decision()
+            print(f"[재분석 요청] {video['title']} ({escalation['model']}, {escalation['reason']})")
+            escalated = self.gemini.analyze_video(video, escalation['model'], escalation['use_transcript'])
+            self.router.record_usage()
+            if escalated:
+                analysis = escalated
+                use_transcript = escalation['use_transcript']
+        
+        if analysis:
+            combined_data = {**video, **analysis}
+            # 설명만 분석한 결과는 라우팅 이력에서 제외하기 위해 분석 근거를 함께 기록합니다.
+            combined_data['analysis_source'] = 'transcript' if use_transcript and video.get('transcript') else 'description'
+            self.db.save_detail_analysis(combined_data)
+            print("[분석 완료] 정보 가치 평가 완료")
+            return combined_data
+        return None
+
+    def create_briefing(self, analyzed_results):
+        """[6단계] 분석 결과를 종합한 통합 브리핑을 생성하고 DB에 저장합니다."""
+        estimate = self.gemini.estimate_briefing_tokens(analyzed_results)
+        if not self.router.briefing_fits(estimate):
+            print(f"[브리핑 생략] 일간 토큰 예산 부족 (필요 약 {estimate:,} tokens, "
+                  f"남은 예산 {self.router.remaining_tokens(reserve_briefing=False):,})")
+            return None
+        briefing_data = self.gemini.generate_briefing(analyzed_results, self.briefing_model)
+        self.router.record_usage()
+        if briefing_data:
+            today_str = datetime.now().strftime("%Y-%m-%d")
+            briefing_data['date'] = today_str
+            self.db.save_daily_briefing(briefing_data)
+        return briefing_data
+
+    def render_site(self):
+        """로컬 정적 아카이브를 갱신합니다. Blogger 장애와 무관하게 결과물을 남깁니다."""
+        try:
+            self.site.build()
+        except Exception as e:
+            print(f"[오류] 정적 아카이브 생성 중 예외 발생: {str(e)}")
+
+    def publish_videos(self, analyzed_results):
+        """[7단계] 개별 영상 분석 결과를 Blogger에 발행하고 발행한 카테고리 목록을 반환합니다."""
+        # 통합 브리핑 1건을 남겨 두고 일간 발행 한도 안에서 점수가 높은 영상부터 발행합니다.
+        limit = max(0, self.planner.remaining_blogger_posts() - 1)
+        if len(analyzed_results) > limit:
+            print(f"[알림] Blogger 일간 발행 한도로 {len(analyzed_results) - limit}개 포스트 발행을 생략합니다.")
+        ranked = sorted(analyzed_results, key=lambda a: a.get('information_value', {}).get('score', a.get('score', 0)), reverse=True)
+
+        published = self.blogger.publish_video_posts(ranked, remaining_posts=limit)
+        if published:
+            self.db.add_api_usage('blogger_posts', len(published))
+        return {analysis.get('category', '미분류') for analysis in published}
+
+    def publish_briefing(self, briefing_data, analyzed_results, categories):
+        """[8단계] 통합 브리핑을 발행합니다."""
+        if self.planner.remaining_blogger_posts() < 1:
+            print("[알림] Blogger 일간 발행 한도로 통합 브리핑 발행을 생략합니다.")
+            return
+        if self.blogger.publish_briefing_post(briefing_data, analyzed_results, list(categories)):
+            self.db.add_api_usage('blogger_posts', 1)
+
+    def run(self, dry_run=False):
+        print("[Youtube Briefing Local] 파이프라인 가동" + (" (dry-run)" if dry_run else ""))
+
+        if not self.load_config():
+            self.shutdown()
+            return
+
+        # 유료/쿼터 API를 호출하기 전에 일간 한도에 맞춰 수집 대상을 정합니다.
+        plan = self.planner.plan(self.config_data)
+        self.planner.print_plan(plan)
+
+        if dry_run:
+            print("\n[종료] dry-run 모드: API를 호출하지 않고 실행 계획만 출력했습니다.")
+            self.shutdown()
+            return
+
+        if not plan['rows']:
+            print("[종료] 일간 한도 안에서 수집할 채널이 없습니다.")
+            self.shutdown()
             return
 
-        print("\n[3단계] 데이터베이스 중복 필터링")
-        processed_ids = self.db.get_processed_video_ids()
-        new_videos = [v for v in all_videos if v['videoId'] not in processed_ids]
+        self.fill_missing_ids(plan['rows'])
+
+        print("\n[2단계] 유튜브 데이터 수집 및 데이터베이스 중복 필터링")
+        new_videos = self.collect_new_videos(plan['rows'])
         
         if not new_videos:
-            print("[종료] 수집된 영상이 모두 이미 처리되었습니다.")
-            self.db.close()
+            print("[종료] 24시간 이내에 발행된 새로운 영상이 없거나 모두 이미 처리되었습니다.")
+            self.shutdown()
             return
             
         print("[완료] 새로운 영상 처리 대기")
 
         print("\n[4단계] 로컬 자막 추출")
-        for video in new_videos:
-            print(f"[자막 요청] {video['title']}")
-            transcript = self.youtube.extract_transcript(video['videoId'])
-            video['transcript'] = transcript
+        representatives = self.prepare_videos(new_videos)
 
         print("\n[5단계] Gemini 데이터 분석 및 DB 저장")
-        analyzed_results = []
-        for video in new_videos:
-            print(f"[분석 요청] {video['title']}")
-            analysis = self.gemini.analyze_video(video, self.analysis_model)
-            
-            if analysis:
-                combined_data = {**video, **analysis}
-                analyzed_results.append(combined_data)
-                self.db.save_detail_analysis(combined_data)
-                print("[분석 완료] 정보 가치 평가 완료")
+        analyzed_results = self.analyze_videos(representatives)
         
         if not analyzed_results:
             print("[종료] 분석에 성공한 데이터가 없어 과정을 생략합니다.")
-            self.db.close()
+            self.shutdown()
             return
 
         print("\n[6단계] Gemini Pro 통합 브리핑 생성")
-        briefing_data = self.gemini.generate_briefing(analyzed_results, self.briefing_model)
-        if briefing_data:
-            today_str = datetime.now().strftime("%Y-%m-%d")
-            briefing_data['date'] = today_str
-            self.db.save_daily_briefing(briefing_data)
+        briefing_data = self.create_briefing(analyzed_results)
+
+        print("\n[6-1단계] 로컬 정적 아카이브 갱신")
+        self.render_site()
 
         print("\n[7단계] Blogger 출판 진행")
-        categories = set()
-        for i, analysis in enumerate(analyzed_results):
-            self.blogger.publish_video_post(analysis)
-            categories.add(analysis.get('category', '미분류'))
-            
-            if i < len(analyzed_results) - 1:
-                time.sleep(10)
+        categories = self.publish_videos(analyzed_results)
 
         if briefing_data:
             print("\n[8단계] 통합 브리핑 출판 진행")
-            self.blogger.publish_briefing_post(briefing_data, analyzed_results, list(categories))
+            self.publish_briefing(briefing_data, analyzed_results, categories)
 
-        self.db.close()
+        self.shutdown()
         print("\n[Youtube Briefing Local] 파이프라인 전체 프로세스 정상 종료")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Youtube Briefing Local 파이프라인")
+    parser.add_argument("--dry-run", action="store_true", help="API 호출 없이 비용/쿼터 실행 계획만 출력")
+    args = parser.parse_args()
+
     orchestrator = PipelineOrchestrator()
-    orchestrator.run()
\ No newline at end of file
+    orchestrator.run(dry_run=args.dry_run)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core_database import SQLiteManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = SQLiteManager(str(tmp_path / "test.db"))
+    yield manager
+    manager.close()
+
+
+def make_analysis(video_id, channel='@channel', category='경제', score=70, grade='B',
+                  signal_ratio='60%', analysis_source='transcript'):
+    """save_detail_analysis에 넘기는 분석 결과 형태의 딕셔너리를 만듭니다."""
+    return {
+        'videoId': video_id,
+        'category': category,
+        'channel': channel,
+        'title': f"제목 {video_id}",
+        'thumbnailUrl': '',
+        'core_fact': ['사실'],
+        'actionable_insight': ['시사점'],
+        'noise_analysis': [],
+        'analysis_source': analysis_source,
+        'information_value': {'score': score, 'grade': grade, 'signal_ratio': signal_ratio, 'reasoning': ''}
+    }
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from core_archive import TranscriptArchive
+
+SAMPLE = "오늘은 시장 동향과 금리 전망을 살펴보겠습니다. 구독과 좋아요 부탁드립니다. 이번 주 주요 일정은 다음과 같습니다. "
+
+
+@pytest.fixture
+def archive(db):
+    return TranscriptArchive(db.conn, min_train_samples=5)
+
+
+def test_round_trip_without_dictionary(archive):
+    raw = json.dumps([{'text': '안녕하세요', 'start': 0.0, 'duration': 1.5}], ensure_ascii=False)
+    archive.store('v1', SAMPLE * 3, raw)
+
+    assert archive.has('v1')
+    assert archive.has('v1', kind='raw')
+    assert archive.get_text('v1') == SAMPLE * 3
+    assert archive.get_text('v1', kind='raw') == raw
+    assert archive.get_text('missing') is None
+
+
+def test_empty_text_is_not_stored(archive):
+    archive.store('v1', None)
+    assert not archive.has('v1')
+
+
+def test_streaming_reads_split_multibyte_characters(archive):
+    text = "".join(f"{i}번째 문장입니다. " for i in range(2000))
+    archive.store('v1', text)
+
+    chunks = list(archive.iter_text('v1', chunk_size=7))
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+
+
+def test_dictionary_is_trained_once_enough_samples_exist(archive, db):
+    for i in range(4):
+        archive.store(f"v{i}", SAMPLE * 5 + f"{i}번 영상")
+    assert archive._latest_dict_id() is None
+
+    archive.store('v4', SAMPLE * 5 + "4번 영상")
+    dict_id = archive._latest_dict_id()
+    assert dict_id is not None
+
+    archive.store('v5', SAMPLE * 2 + "사전 이후 저장")
+    row = db.conn.execute("SELECT dict_id FROM transcript_archive WHERE video_id = 'v5'").fetchone()
+    assert row['dict_id'] == dict_id
+    assert archive.get_text('v5') == SAMPLE * 2 + "사전 이후 저장"
+    # 사전 없이 압축된 이전 행도 그대로 복원됩니다.
+    assert archive.get_text('v0') == SAMPLE * 5 + "0번 영상"
+
+
+def test_dictionary_improves_compression_of_short_transcripts(db):
+    plain = TranscriptArchive(db.conn, min_train_samples=1000)
+    text = SAMPLE + "짧은 자막"
+    plain.store('plain', text)
+    for i in range(10):
+        plain.store(f"train{i}", SAMPLE * 5)
+    plain.train_dictionary()
+    plain.store('trained', text)
+
+    sizes = {row['video_id']: row['compressed_size'] for row in db.conn.execute(
+        "SELECT video_id, compressed_size FROM transcript_archive WHERE video_id IN ('plain', 'trained')"
+    )}
+    assert sizes['trained'] < sizes['plain']
+    assert plain.get_text('trained') == text
+
+
+def test_stats_report_sizes_and_ratio(archive):
+    assert archive.get_stats() == {'videos': 0, 'raw_size': 0, 'compressed_size': 0, 'ratio': None}
+
+    archive.store('v1', SAMPLE * 20)
+    stats = archive.get_stats()
+    assert stats['videos'] == 1
+    assert stats['raw_size'] == len((SAMPLE * 20).encode('utf-8'))
+    assert 0 < stats['ratio'] < 1
@@ -0,0 +1,104 @@
+import pytest
+
+from core_dedup import NearDuplicateDetector, compute_minhash_signature, estimate_similarity
+
+STORY = "한국은행이 기준금리를 0.25%포인트 인하했습니다. 시장은 추가 인하 가능성에 주목하고 있으며 환율과 채권 금리가 동시에 하락했습니다. " * 8
+OTHER = "새로운 반도체 공정이 공개되었습니다. 트랜지스터 밀도가 높아지고 전력 효율이 개선되어 모바일 기기 배터리 수명이 늘어날 전망입니다. " * 8
+
+
+def video(video_id, transcript, category='경제', channel=None):
+    return {'videoId': video_id, 'category': category, 'channel': channel or f"@{video_id}",
+            'title': video_id, 'description': '', 'transcript': transcript}
+
+
+@pytest.fixture
+def detector():
+    # 테스트에서는 프로세스 풀 없이 순차 계산합니다.
+    detector = NearDuplicateDetector()
+    detector._executor = False
+    yield detector
+    detector.close()
+
+
+def test_signature_is_deterministic_and_ignores_punctuation():
+    assert compute_minhash_signature(STORY) == compute_minhash_signature(STORY.replace('.', '!'))
+    assert compute_minhash_signature("짧음") is None
+
+
+def test_similarity_separates_related_and_unrelated_text():
+    base = compute_minhash_signature(STORY)
+    assert estimate_similarity(base, compute_minhash_signature(STORY + " 추가 논평입니다.")) > 0.8
+    assert estimate_similarity(base, compute_minhash_signature(OTHER)) < 0.2
+
+
+def test_invalid_band_configuration():
+    with pytest.raises(ValueError):
+        NearDuplicateDetector(num_perm=100, bands=32)
+
+
+def test_cluster_picks_longest_transcript_as_representative(detector):
+    detector.submit(video('short', STORY))
+    detector.submit(video('long', STORY + " 전문가 인터뷰를 덧붙였습니다."))
+    detector.submit(video('other', OTHER))
+
+    representatives, duplicates = detector.cluster()
+
+    assert sorted(v['videoId'] for v in representatives) == ['long', 'other']
+    assert [(v['videoId'], rep_id) for v, rep_id, _ in duplicates] == [('short', 'long')]
+    assert duplicates[0][2] >= detector.threshold
+
+
+def test_categories_are_clustered_separately(detector):
+    detector.submit(video('economy', STORY, category='경제'))
+    detector.submit(video('affairs', STORY, category='시사'))
+
+    representatives, duplicates = detector.cluster()
+
+    assert len(representatives) == 2
+    assert duplicates == []
+
+
+def test_later_calls_compare_against_indexed_representatives(detector):
+    detector.submit(video('first', STORY))
+    detector.cluster()
+
+    detector.submit(video('second', STORY))
+    representatives, duplicates = detector.cluster()
+
+    assert representatives == []
+    assert duplicates[0][1] == 'first'
+
+
+def test_discard_removes_representative_from_index(detector):
+    detector.submit(video('first', STORY))
+    detector.cluster()
+    detector.discard('first')
+
+    detector.submit(video('second', STORY))
+    representatives, duplicates = detector.cluster()
+
+    assert [v['videoId'] for v in representatives] == ['second']
+    assert duplicates == []
+
+
+def test_promote_replaces_representative_with_cluster_member(detector):
+    detector.submit(video('rep', STORY + " 전문가 인터뷰를 덧붙였습니다."))
+    detector.submit(video('member', STORY))
+    detector.cluster()
+    detector.promote('rep', 'member')
+
+    detector.submit(video('late', STORY))
+    _, duplicates = detector.cluster()
+
+    assert duplicates[0][1] == 'member'
+
+
+def test_reset_clears_index(detector):
+    detector.submit(video('first', STORY))
+    detector.cluster()
+    detector.reset()
+
+    detector.submit(video('second', STORY))
+    representatives, _ = detector.cluster()
+
+    assert [v['videoId'] for v in representatives] == ['second']
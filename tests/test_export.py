@@ -0,0 +1,69 @@
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+from core_export import ParquetExporter
+from conftest import make_analysis
+
+
+def set_date(db, table, key_column, key, date):
+    with db.conn:
+        db.conn.execute(f"UPDATE {table} SET date = ? WHERE {key_column} = ?", (date, key))
+
+
+def test_exports_only_partitions_changed_since_watermark(db, tmp_path):
+    exporter = ParquetExporter(db, str(tmp_path / "export"))
+    db.save_detail_analysis(make_analysis('v1'))
+    set_date(db, 'detail', 'video_id', 'v1', '2026-01-01')
+    db.save_detail_analysis(make_analysis('v2'))
+    set_date(db, 'detail', 'video_id', 'v2', '2026-01-02')
+
+    assert exporter.export_table('detail') == ['2026-01-01', '2026-01-02']
+    assert exporter.export_table('detail') == []
+
+    db.save_detail_analysis(make_analysis('v3'))
+    set_date(db, 'detail', 'video_id', 'v3', '2026-01-02')
+    assert exporter.export_table('detail') == ['2026-01-02']
+
+    table = pq.read_table(str(tmp_path / "export" / "detail" / "date=2026-01-02" / "part-0.parquet"))
+    assert sorted(table.column('video_id').to_pylist()) == ['v2', 'v3']
+    assert table.column('core_fact').to_pylist()[0] == ['사실']
+
+
+def put_daily(db, date, investment):
+    # save_daily_briefing과 같은 INSERT OR REPLACE를 지정한 날짜로 실행합니다.
+    with db.conn:
+        db.conn.execute("INSERT OR REPLACE INTO daily (date, investment) VALUES (?, ?)", (date, investment))
+
+
+def test_replaced_rows_are_exported(db, tmp_path):
+    exporter = ParquetExporter(db, str(tmp_path / "export"))
+    for date in ('2026-01-01', '2026-01-02', '2026-01-03'):
+        put_daily(db, date, '초안')
+    exporter.export_table('daily')
+
+    put_daily(db, '2026-01-03', '수정')
+
+    assert exporter.export_table('daily') == ['2026-01-03']
+
+
+def test_vacuum_does_not_trigger_reexport(db, tmp_path):
+    exporter = ParquetExporter(db, str(tmp_path / "export"))
+    for date in ('2026-01-01', '2026-01-02'):
+        put_daily(db, date, '초안')
+    put_daily(db, '2026-01-01', '수정')
+    exporter.export_table('daily')
+
+    db.conn.execute("VACUUM")
+    assert exporter.export_table('daily') == []
+
+    put_daily(db, '2026-01-02', '재수정')
+    assert exporter.export_table('daily') == ['2026-01-02']
+
+
+def test_full_export_after_reset(db, tmp_path):
+    exporter = ParquetExporter(db, str(tmp_path / "export"))
+    db.save_detail_analysis(make_analysis('v1'))
+    exporter.export_table('detail')
+
+    exporter.reset_watermarks()
+    assert len(exporter.export_table('detail')) == 1
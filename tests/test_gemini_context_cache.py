@@ -0,0 +1,173 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+errors = pytest.importorskip("google.genai.errors")
+from api_gemini import GeminiAnalyzer, GeminiContextCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCaches:
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.deleted = []
+        self.fail_create = False
+
+    def create(self, model, config):
+        if self.fail_create:
+            raise RuntimeError("cached content is too small")
+        name = f"cachedContents/{len(self.created)}"
+        self.created.append((model, name))
+        return SimpleNamespace(name=name)
+
+    def update(self, name, config):
+        self.updated.append(name)
+
+    def delete(self, name):
+        self.deleted.append(name)
+
+
+class FakeModels:
+    def __init__(self, outcomes=(), prefix_tokens=5000):
+        self.outcomes = list(outcomes)
+        self.calls = []
+        self.prefix_tokens = prefix_tokens
+        self.counted = []
+
+    def count_tokens(self, model, contents):
+        self.counted.append(model)
+        return SimpleNamespace(total_tokens=self.prefix_tokens)
+
+    def generate_content(self, model, contents, config):
+        self.calls.append(getattr(config, 'cached_content', None))
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(text=json.dumps(outcome), usage_metadata=None)
+
+
+def make_cache(prefix_tokens=5000):
+    clock = FakeClock()
+    client = SimpleNamespace(caches=FakeCaches(), models=FakeModels(prefix_tokens=prefix_tokens))
+    cache = GeminiContextCache(client, ttl_seconds=3600, refresh_margin_seconds=300,
+                               retry_after_seconds=600, clock=clock)
+    return cache, client.caches, clock
+
+
+def test_creates_once_and_reuses():
+    cache, caches, _ = make_cache()
+    first = cache.get('경제', 'gemini-2.5-flash', '지시문')
+    second = cache.get('경제', 'gemini-2.5-flash', '지시문')
+    assert first == second == "cachedContents/0"
+    assert len(caches.created) == 1
+    assert caches.updated == []
+
+
+def test_separate_entries_per_category_and_model():
+    cache, caches, _ = make_cache()
+    cache.get('경제', 'gemini-2.5-flash', '지시문')
+    cache.get('기술', 'gemini-2.5-flash', '지시문')
+    cache.get('경제', 'gemini-2.5-pro', '지시문')
+    assert len(caches.created) == 3
+
+
+def test_refreshes_ttl_before_expiry():
+    cache, caches, clock = make_cache()
+    name = cache.get('경제', 'gemini-2.5-flash', '지시문')
+    clock.now += 3600 - 200
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') == name
+    assert caches.updated == [name]
+    assert len(caches.created) == 1
+
+    # 연장된 TTL 안에서는 다시 갱신하지 않습니다.
+    clock.now += 1000
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') == name
+    assert caches.updated == [name]
+
+
+def test_recreates_after_expiry():
+    cache, caches, clock = make_cache()
+    cache.get('경제', 'gemini-2.5-flash', '지시문')
+    clock.now += 3601
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') == "cachedContents/1"
+    assert len(caches.created) == 2
+
+
+def test_create_failure_disables_until_retry_time():
+    cache, caches, clock = make_cache()
+    caches.fail_create = True
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') is None
+
+    caches.fail_create = False
+    clock.now += 300
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') is None
+    assert caches.created == []
+
+    clock.now += 301
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') == "cachedContents/0"
+
+
+def test_prefix_below_model_minimum_is_never_cached():
+    cache, caches, clock = make_cache(prefix_tokens=2000)
+    models = cache.client.models
+
+    # Flash(최소 1024)는 캐시하고, Pro(최소 4096)는 캐시 없이 호출합니다.
+    assert cache.get('경제', 'gemini-2.5-flash', '지시문') == "cachedContents/0"
+    assert cache.get('경제', 'gemini-2.5-pro', '지시문') is None
+
+    # 재시도 시각이 지나도 다시 세거나 만들지 않습니다.
+    clock.now += 7200
+    assert cache.get('경제', 'gemini-2.5-pro', '지시문') is None
+    assert models.counted == ['gemini-2.5-flash', 'gemini-2.5-pro']
+    assert [model for model, _ in caches.created] == ['gemini-2.5-flash']
+
+
+def test_close_deletes_remaining_caches():
+    cache, caches, _ = make_cache()
+    cache.get('경제', 'gemini-2.5-flash', '지시문')
+    cache.get('기술', 'gemini-2.5-flash', '지시문')
+    cache.close()
+    assert sorted(caches.deleted) == ["cachedContents/0", "cachedContents/1"]
+
+
+def make_analyzer(outcomes):
+    analyzer = GeminiAnalyzer.__new__(GeminiAnalyzer)
+    client = SimpleNamespace(caches=FakeCaches(), models=FakeModels(outcomes))
+    analyzer.client = client
+    analyzer.context_cache = GeminiContextCache(client, clock=FakeClock())
+    analyzer.last_usage = None
+    analyzer.tokens_used = 0
+    analyzer._result_cache = None
+    return analyzer, client
+
+
+VIDEO = {'videoId': 'v1', 'category': '경제', 'channel': '@c', 'title': '제목', 'description': '설명', 'transcript': '자막'}
+
+
+def test_falls_back_without_cache_when_cache_is_missing():
+    missing = errors.ClientError(404, {'error': {'code': 404, 'message': 'CachedContent not found', 'status': 'NOT_FOUND'}})
+    analyzer, client = make_analyzer([missing, {'information_value': {'score': 70}}])
+
+    result = analyzer.analyze_video(VIDEO, 'gemini-2.5-flash')
+
+    assert result == {'information_value': {'score': 70}}
+    assert client.models.calls == ["cachedContents/0", None]
+    # 사라진 캐시는 지워져 다음 호출에서 새로 만들어집니다.
+    assert analyzer.context_cache.get('경제', 'gemini-2.5-flash', '지시문') == "cachedContents/1"
+
+
+def test_does_not_retry_without_cache_when_rate_limited():
+    limited = errors.ClientError(429, {'error': {'code': 429, 'message': 'Resource exhausted', 'status': 'RESOURCE_EXHAUSTED'}})
+    analyzer, client = make_analyzer([limited])
+
+    assert analyzer.analyze_video(VIDEO, 'gemini-2.5-flash') is None
+    assert client.models.calls == ["cachedContents/0"]
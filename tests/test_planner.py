@@ -0,0 +1,128 @@
+import pytest
+
+from core_archive import TranscriptArchive
+from core_planner import RunPlanner, SEARCH_QUOTA_COST, FETCH_QUOTA_COST
+from core_routing import ModelRouter
+from conftest import make_analysis
+
+
+class FakeAnalyzer:
+    """자막 10자당 1토큰, 설명 10자당 1토큰 + 고정 100토큰으로 추정하는 가짜 분석기"""
+    last_usage = None
+
+    def estimate_analysis_tokens(self, video, use_transcript=True):
+        text = video['transcript'] if use_transcript else video['description']
+        return len(text) // 10 + 100
+
+
+FULL_TOKENS = 20000 // 10 + 100
+DESCRIPTION_TOKENS = 500 // 10 + 100
+
+
+def row(handle, channel_id='UCx', category='경제'):
+    return {'Category': category, 'Handle': handle, 'FilterCriteria': 'newest', 'ChannelID': channel_id,
+            'UploadsID': channel_id.replace('UC', 'UU') if channel_id else ''}
+
+
+def add_history(db, channel, score, count=3):
+    for i in range(count):
+        db.save_detail_analysis(make_analysis(f"{channel}-{i}", channel=channel, score=score))
+
+
+def make_planner(db, daily_token_budget=0, briefing_reserve=1000, youtube_daily_quota=10000, blogger_daily_posts=50):
+    router = ModelRouter(db, FakeAnalyzer(), daily_token_budget=daily_token_budget, briefing_reserve=briefing_reserve)
+    archive = TranscriptArchive(db.conn)
+    return RunPlanner(db, router, archive, youtube_daily_quota=youtube_daily_quota,
+                      blogger_daily_posts=blogger_daily_posts)
+
+
+def handles(rows):
+    return [r['Handle'] for r in rows]
+
+
+def test_rows_are_ordered_by_channel_history(db):
+    add_history(db, '@good', 90)
+    add_history(db, '@cheap', 35)
+    planner = make_planner(db)
+
+    plan = planner.plan([row('@cheap'), row('@new'), row('@good')])
+
+    assert handles(plan['rows']) == ['@good', '@new', '@cheap']
+    tiers = {entry['row']['Handle']: entry['tier'] for entry in plan['entries']}
+    assert tiers['@cheap']['model'] == planner.router.cheap_model
+    assert tiers['@cheap']['use_transcript'] is False
+    assert tiers['@good']['use_transcript'] is True
+
+
+def test_low_signal_channels_are_dropped(db):
+    add_history(db, '@noise', 10)
+    plan = make_planner(db).plan([row('@noise'), row('@new')])
+
+    assert handles(plan['rows']) == ['@new']
+    assert plan['dropped'][0][0]['Handle'] == '@noise'
+
+
+def test_youtube_quota_counts_channel_search(db):
+    planner = make_planner(db, youtube_daily_quota=FETCH_QUOTA_COST + SEARCH_QUOTA_COST + FETCH_QUOTA_COST)
+
+    plan = planner.plan([row('@known'), row('@search', channel_id=''), row('@over', channel_id='')])
+
+    assert handles(plan['rows']) == ['@known', '@search']
+    assert plan['youtube_units'] == 2 * FETCH_QUOTA_COST + SEARCH_QUOTA_COST
+    assert [(r['Handle'], reason) for r, reason in plan['dropped']] == [('@over', "YouTube 일간 쿼터 부족")]
+
+
+def test_quota_already_used_today_is_subtracted(db):
+    db.add_api_usage('youtube_quota', 10000 - FETCH_QUOTA_COST)
+    plan = make_planner(db).plan([row('@a'), row('@b')])
+
+    assert handles(plan['rows']) == ['@a']
+    assert plan['remaining']['youtube'] == FETCH_QUOTA_COST
+
+
+def test_gemini_budget_downgrades_then_drops(db):
+    reserve = 1000
+    planner = make_planner(db, daily_token_budget=reserve + FULL_TOKENS + DESCRIPTION_TOKENS, briefing_reserve=reserve)
+
+    plan = planner.plan([row('@a'), row('@b'), row('@c')])
+
+    assert handles(plan['rows']) == ['@a', '@b']
+    assert plan['entries'][0]['tier']['use_transcript'] is True
+    assert plan['entries'][1]['tier']['model'] == planner.router.cheap_model
+    assert plan['entries'][1]['gemini_tokens'] == DESCRIPTION_TOKENS
+    assert plan['dropped'][0][1] == "Gemini 일간 토큰 예산 부족"
+    # 브리핑 예비분까지 포함한 총 추정치
+    assert plan['gemini_tokens'] == FULL_TOKENS + DESCRIPTION_TOKENS + reserve
+
+
+def test_blogger_ceiling_keeps_one_post_for_briefing(db):
+    plan = make_planner(db, blogger_daily_posts=3).plan([row('@a'), row('@b'), row('@c')])
+
+    assert handles(plan['rows']) == ['@a', '@b']
+    assert plan['blogger_posts'] == 3
+    assert plan['dropped'][0][1] == "Blogger 일간 발행 한도 부족"
+
+
+def test_archived_transcripts_drive_token_estimate(db):
+    db.save_detail_analysis(make_analysis('v1', channel='@short'))
+    TranscriptArchive(db.conn).store('v1', "가" * 1000)
+    plan = make_planner(db).plan([row('@short')])
+
+    # 한글 1000자 = 3000 bytes, BYTES_PER_CHAR(2.5)로 환산하면 1200자
+    assert plan['entries'][0]['gemini_tokens'] == 1200 // 10 + 100
+
+
+def test_empty_plan_has_no_briefing(db):
+    plan = make_planner(db).plan([{'Category': '경제', 'Handle': ''}])
+    assert plan['rows'] == []
+    assert plan['blogger_posts'] == 0
+    assert plan['gemini_tokens'] == 0
+
+
+def test_order_videos_by_channel_score(db):
+    add_history(db, '@good', 90)
+    add_history(db, '@cheap', 35)
+    planner = make_planner(db)
+
+    videos = [{'channel': '@cheap'}, {'channel': '@new'}, {'channel': '@good'}]
+    assert [v['channel'] for v in planner.order_videos(videos)] == ['@good', '@new', '@cheap']
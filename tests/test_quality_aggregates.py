@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from core_database import parse_signal_ratio
+from conftest import make_analysis
+
+
+@pytest.mark.parametrize("value, expected", [
+    ('72%', 72.0),
+    (' 40 % ', 40.0),
+    ('0.35', 35.0),
+    (55, 55.0),
+    ('150%', 100.0),
+    ('N/A', None),
+    (None, None),
+])
+def test_parse_signal_ratio(value, expected):
+    assert parse_signal_ratio(value) == expected
+
+
+def aggregate_rows(db):
+    return [tuple(row) for row in db.conn.execute("SELECT * FROM quality_daily ORDER BY scope, key, date")]
+
+
+def test_summary_accumulates_per_channel_and_category(db):
+    db.save_detail_analysis(make_analysis('v1', channel='@a', score=80, grade='A', signal_ratio='80%'))
+    db.save_detail_analysis(make_analysis('v2', channel='@a', score=60, grade='C', signal_ratio='N/A'))
+    db.save_detail_analysis(make_analysis('v3', channel='@b', score=40, grade='D', signal_ratio='20%'))
+
+    channels = {s['key']: s for s in db.get_quality_summary('channel')}
+    assert channels['@a']['video_count'] == 2
+    assert channels['@a']['mean_score'] == 70.0
+    # 해석할 수 없는 신호 비율은 평균에서 제외됩니다.
+    assert channels['@a']['mean_signal_ratio'] == 80.0
+    assert channels['@a']['grades']['A'] == 1
+    assert channels['@a']['grades']['C'] == 1
+
+    category = db.get_quality_summary('category', key='경제')[0]
+    assert category['video_count'] == 3
+    assert category['mean_score'] == 60.0
+
+    # 평균 점수 내림차순으로 정렬됩니다.
+    assert [s['key'] for s in db.get_quality_summary('channel')] == ['@a', '@b']
+
+
+def test_duplicate_save_does_not_double_count(db):
+    db.save_detail_analysis(make_analysis('v1', score=80))
+    db.save_detail_analysis(make_analysis('v1', score=10))
+
+    summary = db.get_quality_summary('channel')[0]
+    assert summary['video_count'] == 1
+    assert summary['mean_score'] == 80.0
+
+
+def test_description_only_scores_are_kept_out_of_routing_history(db):
+    db.save_detail_analysis(make_analysis('v1', score=80))
+    db.save_detail_analysis(make_analysis('v2', score=20, analysis_source='description'))
+
+    summary = db.get_quality_summary('channel')[0]
+    assert summary['video_count'] == 2
+    assert summary['mean_score'] == 50.0
+    assert summary['transcript_count'] == 1
+    assert summary['transcript_mean_score'] == 80.0
+
+
+def test_rebuild_matches_incremental_aggregates(db):
+    for i, score in enumerate([90, 75, 30]):
+        db.save_detail_analysis(make_analysis(f"v{i}", channel=f"@c{i % 2}", score=score, grade='ABF'[i]))
+    db.save_detail_analysis(make_analysis('v9', score=50, analysis_source='description'))
+    incremental = aggregate_rows(db)
+
+    db.rebuild_quality_aggregates()
+
+    assert aggregate_rows(db) == incremental
+
+
+def test_rolling_windows_and_trend(db):
+    today = datetime.now()
+    for i, (days_ago, score) in enumerate([(0, 90), (10, 60), (60, 30)]):
+        db.save_detail_analysis(make_analysis(f"v{i}", score=score))
+        date = (today - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+        with db.conn:
+            db.conn.execute("UPDATE detail SET date = ? WHERE video_id = ?", (date, f"v{i}"))
+    db.rebuild_quality_aggregates()
+
+    rolling = db.get_rolling_quality('channel', '@channel')
+    assert rolling[7]['video_count'] == 1
+    assert rolling[30]['mean_score'] == 75.0
+    assert rolling[90]['mean_score'] == 60.0
+
+    trend = db.get_quality_trend('channel', '@channel', days=90)
+    assert [point['mean_score'] for point in trend] == [30.0, 60.0, 90.0]
+
+
+def test_existing_database_is_backfilled(tmp_path):
+    from core_database import SQLiteManager
+
+    path = str(tmp_path / "legacy.db")
+    manager = SQLiteManager(path)
+    manager.save_detail_analysis(make_analysis('v1', score=70))
+    with manager.conn:
+        manager.conn.execute("DELETE FROM quality_daily")
+    manager.close()
+
+    reopened = SQLiteManager(path)
+    try:
+        assert reopened.get_quality_summary('channel')[0]['video_count'] == 1
+    finally:
+        reopened.close()
@@ -0,0 +1,65 @@
+import os
+
+from core_site import StaticSiteRenderer
+from conftest import make_analysis
+
+
+def test_only_changed_pages_are_rerendered(db, tmp_path):
+    site = StaticSiteRenderer(db, str(tmp_path / "site"))
+    db.save_detail_analysis(make_analysis('v1', category='경제'))
+
+    # 영상 페이지, 카테고리 색인, 첫 페이지
+    assert site.build() == 3
+    assert os.path.exists(tmp_path / "site" / "videos" / "v1.html")
+    assert site.build() == 0
+
+    # 같은 카테고리에 영상이 추가되면 새 영상 페이지와 목록 페이지만 다시 씁니다.
+    db.save_detail_analysis(make_analysis('v2', category='경제'))
+    assert site.build() == 3
+
+
+def test_new_category_rerenders_navigation_everywhere(db, tmp_path):
+    site = StaticSiteRenderer(db, str(tmp_path / "site"))
+    db.save_detail_analysis(make_analysis('v1', category='경제'))
+    site.build()
+
+    # 모든 페이지의 내비게이션에 새 카테고리가 추가됩니다. (영상 2, 카테고리 2, 첫 페이지)
+    db.save_detail_analysis(make_analysis('v2', category='기술'))
+    assert site.build() == 5
+    assert 'category/' in (tmp_path / "site" / "videos" / "v1.html").read_text(encoding='utf-8')
+
+
+def test_video_added_after_briefing_updates_daily_gallery(db, tmp_path):
+    site = StaticSiteRenderer(db, str(tmp_path / "site"))
+    db.save_detail_analysis(make_analysis('v1'))
+    db.save_daily_briefing({'htmlBody': '<p>브리핑</p>'})
+    site.build()
+
+    db.save_detail_analysis(make_analysis('v2'))
+    # 새 영상 페이지, 같은 날짜의 일간 브리핑, 카테고리 색인, 첫 페이지
+    assert site.build() == 4
+    daily = next((tmp_path / "site" / "daily").iterdir()).read_text(encoding='utf-8')
+    assert 'videos/v2.html' in daily
+
+
+def test_missing_file_is_rewritten(db, tmp_path):
+    site = StaticSiteRenderer(db, str(tmp_path / "site"))
+    db.save_detail_analysis(make_analysis('v1'))
+    site.build()
+
+    os.remove(tmp_path / "site" / "videos" / "v1.html")
+    # 증분 빌드는 바뀐 행만 보므로 지워진 파일은 전체 빌드에서 되살립니다.
+    assert site.build() == 0
+    assert site.build(full=True) == 1
+
+
+def test_titles_are_escaped(db, tmp_path):
+    site = StaticSiteRenderer(db, str(tmp_path / "site"))
+    analysis = make_analysis('v1')
+    analysis['title'] = '<script>alert(1)</script>'
+    db.save_detail_analysis(analysis)
+    site.build()
+
+    page = (tmp_path / "site" / "videos" / "v1.html").read_text(encoding='utf-8')
+    assert '<script>' not in page
+    assert '&lt;script&gt;' in page